@@ -0,0 +1,277 @@
+"""
+analytics.py — агреговані показники голосувань по всіх кварталах.
+
+Усе рахується векторно на матрицях з votes.py. Проміжні результати кожного архіву
+зберігаються поруч з його матрицею, тож новий квартал додає лише одне нове обчислення.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pathlib import Path
+from data import CACHE_DIR
+from utils import content_hash
+from store import read_table
+from votes import ABSENT, VOTE_CODES
+
+PROFILES_DIR = CACHE_DIR / "profiles"
+BLOCS_DIR = CACHE_DIR / "blocs"
+
+# Голоси, що вважаються участю у голосуванні
+CAST_CODES = (VOTE_CODES["За"], VOTE_CODES["Проти"], VOTE_CODES["Утримався"])
+
+# Позафракційні не мають спільної позиції — для них «проти фракції» не рахується
+NO_FACTION = "Позафракційні"
+
+PROFILE_COUNTS = ["questions", "cast", "За", "Проти", "Утримався", "against_faction", "faction_votes"]
+
+
+def _run_lengths(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    bool-матриця [рядки × питання] → (найдовша серія True, серія на початку, серія в кінці) для кожного рядка.
+    """
+    n_rows, n_cols = mask.shape
+    padded = np.zeros((n_rows, n_cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    starts = np.argwhere(edges == 1)
+    ends = np.argwhere(edges == -1)
+    longest = np.zeros(n_rows, dtype=np.int32)
+    np.maximum.at(longest, starts[:, 0], ends[:, 1] - starts[:, 1])
+
+    leading = np.where(mask.all(axis=1), n_cols, np.argmin(mask, axis=1))
+    trailing = np.where(mask.all(axis=1), n_cols, np.argmin(mask[:, ::-1], axis=1))
+    return longest, leading, trailing
+
+
+def faction_majority(matrix: np.ndarray, parties: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Позиція більшості кожної фракції в кожному питанні.
+    Повертає (factions, majority): majority[f, q] — код голосу з CAST_CODES або ABSENT, якщо рівність/ніхто не голосував.
+    """
+    factions = np.array(sorted(p for p in set(parties) if p != NO_FACTION), dtype=str)
+    member = parties[None, :] == factions[:, None]                                # [фракції × рядки]
+    counts = np.stack([member.astype(np.int32) @ (matrix == code) for code in CAST_CODES])  # [коди × фракції × питання]
+    top = counts.max(axis=0)
+    is_top = counts == top
+    majority = np.array(CAST_CODES, dtype=np.int8)[counts.argmax(axis=0)]
+    majority[(top == 0) | (is_top.sum(axis=0) > 1)] = ABSENT
+    return factions, majority
+
+
+def rice_cohesion(matrix: np.ndarray, parties: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Індекс згуртованості Райса |За − (Проти + Утримався)| / (За + Проти + Утримався)
+    для кожної фракції в кожному питанні. Повертає (factions, cohesion[f, q]); NaN — фракція не голосувала.
+    """
+    factions = np.array(sorted(p for p in set(parties) if p != NO_FACTION), dtype=str)
+    member = (parties[None, :] == factions[:, None]).astype(np.int32)             # [фракції × рядки]
+    yes = member @ (matrix == VOTE_CODES["За"])
+    no = member @ ((matrix == VOTE_CODES["Проти"]) | (matrix == VOTE_CODES["Утримався"]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cohesion = np.abs(yes - no) / (yes + no)
+    return factions, cohesion
+
+
+def pairwise_agreement(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Матриці «депутат × депутат»: (same, both) — у скількох питаннях обидва голосували однаково
+    і у скількох обидва взяли участь. Частка збігу = same / both.
+    """
+    same = np.zeros((matrix.shape[0], matrix.shape[0]), dtype=np.int32)
+    for code in CAST_CODES:
+        votes = (matrix == code).astype(np.float32)
+        same += (votes @ votes.T).astype(np.int32)
+    cast = np.isin(matrix, CAST_CODES).astype(np.float32)
+    both = (cast @ cast.T).astype(np.int32)
+    return same, both
+
+
+def _archive_profile(matrix_dir: Path) -> pd.DataFrame:
+    """Показники одного архіву по кожному депутату. Зберігається в matrix_dir/profile.parquet."""
+    path = matrix_dir / "profile.parquet"
+    if path.exists():
+        return pd.read_parquet(path)
+
+    matrix = np.asarray(np.load(matrix_dir / "matrix.npy", mmap_mode="r"))
+    rows_df = pd.read_parquet(matrix_dir / "rows.parquet")
+    parties = rows_df['party'].to_numpy(dtype=str)
+
+    cast = np.isin(matrix, CAST_CODES)
+    factions, majority = faction_majority(matrix, parties)
+    row_majority = np.full(matrix.shape, ABSENT, dtype=np.int8)
+    has_faction = np.isin(parties, factions)
+    row_majority[has_faction] = majority[np.searchsorted(factions, parties[has_faction])]
+    faction_votes = cast & (row_majority != ABSENT)
+
+    longest, leading, trailing = _run_lengths(~cast)
+    profile = pd.DataFrame({
+        "id": rows_df['id'],
+        "questions": matrix.shape[1],
+        "cast": cast.sum(axis=1),
+        **{label: (matrix == VOTE_CODES[label]).sum(axis=1) for label in ("За", "Проти", "Утримався")},
+        "against_faction": (faction_votes & (matrix != row_majority)).sum(axis=1),
+        "faction_votes": faction_votes.sum(axis=1),
+        "longest_absence": longest,
+        "leading_absence": leading,
+        "trailing_absence": trailing,
+    })
+    profile = profile[profile['id'].notna()].reset_index(drop=True)
+    profile.to_parquet(path, index=False)
+    return profile
+
+
+def build_deputy_profiles(matrix_dirs: list[Path]) -> pd.DataFrame:
+    """
+    Профілі депутатів по всіх архівах (у хронологічному порядку matrix_dirs):
+    участь, частки За/Проти/Утримався, голосування проти більшості своєї фракції, найдовша серія пропусків.
+    Серії пропусків зшиваються через межі кварталів.
+    """
+    archive_profiles = [_archive_profile(Path(d)).set_index('id') for d in matrix_dirs]
+    if not archive_profiles:
+        return pd.DataFrame(columns=["id", "questions", "participation", "За", "Проти", "Утримався", "against_faction", "longest_absence"])
+
+    ids = archive_profiles[0].index
+    for p in archive_profiles[1:]:
+        ids = ids.union(p.index)
+    total = pd.DataFrame(0, index=ids, columns=PROFILE_COUNTS)
+    streak = pd.Series(0, index=ids)  # поточна серія пропусків на кінці вже оброблених архівів
+    best = pd.Series(0, index=ids)
+    for p in archive_profiles:
+        p = p.reindex(ids, fill_value=0)
+        total += p[PROFILE_COUNTS]
+        joined = streak + p['leading_absence']
+        best = np.maximum(best, np.maximum(p['longest_absence'], joined))
+        streak = joined.where(p['leading_absence'] == p['questions'], p['trailing_absence'])
+
+    profiles = pd.DataFrame({
+        "questions": total['questions'].astype(int),
+        "participation": total['cast'] / total['questions'].where(total['questions'] > 0),
+        **{label: total[label] / total['cast'].where(total['cast'] > 0) for label in ("За", "Проти", "Утримався")},
+        "against_faction": total['against_faction'] / total['faction_votes'].where(total['faction_votes'] > 0),
+        "longest_absence": best.astype(int),
+    }).fillna(0.0)
+    profiles.index = profiles.index.astype(int)
+    return profiles.rename_axis('id').reset_index()
+
+
+def _archive_blocs(matrix_dir: Path) -> tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Згуртованість фракцій і лічильники збігів одного архіву.
+    Зберігаються в matrix_dir/cohesion.parquet та matrix_dir/agreement.npz.
+    """
+    cohesion_path, agreement_path = matrix_dir / "cohesion.parquet", matrix_dir / "agreement.npz"
+    if cohesion_path.exists() and agreement_path.exists():
+        saved = np.load(agreement_path)
+        return pd.read_parquet(cohesion_path), saved["ids"], saved["same"], saved["both"]
+
+    matrix = np.asarray(np.load(matrix_dir / "matrix.npy", mmap_mode="r"))
+    rows_df = pd.read_parquet(matrix_dir / "rows.parquet")
+    questions_df = pd.read_parquet(matrix_dir / "questions.parquet")
+
+    factions, cohesion = rice_cohesion(matrix, rows_df['party'].to_numpy(dtype=str))
+    f_idx, q_idx = np.nonzero(~np.isnan(cohesion))
+    cohesion_df = pd.DataFrame({
+        "party": factions[f_idx],
+        "date": questions_df['date'].to_numpy()[q_idx],
+        "gl_text": questions_df['gl_text'].to_numpy()[q_idx],
+        "rice": cohesion[f_idx, q_idx],
+    })
+
+    known = rows_df['id'].notna().to_numpy()
+    ids = rows_df.loc[known, 'id'].to_numpy(dtype=np.int64)
+    same, both = pairwise_agreement(matrix[known])
+
+    cohesion_df.to_parquet(cohesion_path, index=False)
+    np.savez_compressed(agreement_path, ids=ids, same=same, both=both)
+    return cohesion_df, ids, same, both
+
+
+def build_voting_blocs(matrix_dirs: list[Path]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Аналітика блоків по всіх архівах → (cohesion_df, agreement_df):
+        cohesion_df  — party, date, gl_text, rice для кожної фракції в кожному питанні
+        agreement_df — квадратна таблиця id × id, частка питань з однаковим голосом (NaN — не перетинались)
+    Лічильники збігів сумуються між архівами, а не усереднюються частки.
+    """
+    cohesion_frames, ids_all, parts = [], np.array([], dtype=np.int64), []
+    for matrix_dir in matrix_dirs:
+        cohesion_df, ids, same, both = _archive_blocs(Path(matrix_dir))
+        cohesion_frames.append(cohesion_df)
+        parts.append((ids, same, both))
+        ids_all = np.union1d(ids_all, ids)
+
+    same_total = np.zeros((len(ids_all), len(ids_all)), dtype=np.int64)
+    both_total = np.zeros_like(same_total)
+    for ids, same, both in parts:
+        pos = np.searchsorted(ids_all, ids)
+        same_total[np.ix_(pos, pos)] += same
+        both_total[np.ix_(pos, pos)] += both
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        agreement = np.where(both_total > 0, same_total / both_total, np.nan)
+    agreement_df = pd.DataFrame(agreement, index=ids_all, columns=ids_all)
+    cohesion_df = (
+        pd.concat(cohesion_frames, ignore_index=True) if cohesion_frames
+        else pd.DataFrame(columns=["party", "date", "gl_text", "rice"])
+    )
+    return cohesion_df, agreement_df
+
+
+def save_deputy_profiles(matrix_dirs: list[Path]) -> pd.DataFrame:
+    """Профілі депутатів по всіх кварталах (etl.py). Таблиця зберігається в PROFILES_DIR за набором матриць."""
+    key = content_hash("|".join(Path(d).name for d in matrix_dirs).encode("utf-8"))[:24]
+    path = PROFILES_DIR / f"{key}.parquet"
+    if path.exists():
+        return pd.read_parquet(path)
+    profiles = build_deputy_profiles(matrix_dirs)
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    profiles.to_parquet(path, index=False)
+    return profiles
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def read_deputy_profiles() -> pd.DataFrame | None:
+    """
+    Готові профілі без обчислень у запиті: таблиця deputy_profiles з etl.py, інакше останній збережений
+    parquet з PROFILES_DIR. None — профілі ще не обчислені.
+    """
+    profiles = read_table("deputy_profiles")
+    if profiles is not None and len(profiles):
+        return profiles
+    saved = sorted(PROFILES_DIR.glob("*.parquet"), key=lambda p: p.stat().st_mtime)
+    return pd.read_parquet(saved[-1]) if saved else None
+
+
+def save_voting_blocs(matrix_dirs: list[Path]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Згуртованість фракцій та матриця збігів по всіх кварталах (etl.py). Таблиці зберігаються в BLOCS_DIR за набором матриць."""
+    key = content_hash("|".join(Path(d).name for d in matrix_dirs).encode("utf-8"))[:24]
+    cohesion_path, agreement_path = BLOCS_DIR / f"{key}_cohesion.parquet", BLOCS_DIR / f"{key}_agreement.parquet"
+    if cohesion_path.exists() and agreement_path.exists():
+        return _read_blocs(cohesion_path, agreement_path)
+    cohesion_df, agreement_df = build_voting_blocs(matrix_dirs)
+    BLOCS_DIR.mkdir(parents=True, exist_ok=True)
+    # Спершу матриця збігів: read_voting_blocs шукає пари за файлом згуртованості
+    agreement_df.set_axis(agreement_df.columns.astype(str), axis=1).to_parquet(agreement_path)
+    cohesion_df.to_parquet(cohesion_path, index=False)
+    return cohesion_df, agreement_df
+
+
+def _read_blocs(cohesion_path: Path, agreement_path: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
+    agreement_df = pd.read_parquet(agreement_path)
+    agreement_df.columns = agreement_df.columns.astype(int)
+    return pd.read_parquet(cohesion_path), agreement_df
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def read_voting_blocs() -> tuple[pd.DataFrame, pd.DataFrame] | None:
+    """
+    Готова аналітика блоків без обчислень у запиті: остання збережена пара таблиць з BLOCS_DIR.
+    None — etl.py ще не рахував блоки.
+    """
+    saved = sorted(BLOCS_DIR.glob("*_cohesion.parquet"), key=lambda p: p.stat().st_mtime)
+    for cohesion_path in reversed(saved):
+        agreement_path = cohesion_path.with_name(cohesion_path.name.replace("_cohesion", "_agreement"))
+        if agreement_path.exists():
+            return _read_blocs(cohesion_path, agreement_path)
+    return None
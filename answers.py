@@ -0,0 +1,103 @@
+"""
+answers.py — спільний для всіх сесій кеш відповідей чату про рішення.
+
+Відповідь на перше питання розмови не залежить від історії, тож зберігається в
+CACHE_DIR/answers/<ключ>.json, де ключ — sha256 PDF рішення (або посилання) + хеш нормалізованого
+питання, системного промпту й моделі + ANSWER_PROMPT_VERSION. Повторне питання (здебільшого
+PREMADE_QUESTIONS про популярне рішення) відтворюється як стрім за мілісекунди, без запиту до API.
+
+Запуск окремо: python answers.py [--workers N] — відповіді на PREMADE_QUESTIONS для всіх рішень,
+зіставлених з питаннями VOTING_QUARTERS.
+"""
+
+import re
+from data import CACHE_DIR
+from utils import content_hash
+from generated import read_generated, write_generated, run_batch, load_matched_decisions, workers_arg
+from pdfs import get_pdf_path, is_pdf_url
+import llm
+
+ANSWERS_DIR = CACHE_DIR / "answers"
+
+ANSWER_PROMPT_VERSION = 1
+ANSWER_MODEL = "claude-haiku-4-5"
+ANSWER_MAX_TOKENS = 1024
+
+MAX_CONCURRENCY = 4
+
+
+def normalize_question(question: str) -> str:
+    """Нижній регістр, єдині пробіли та апостроф, без кінцевих розділових знаків."""
+    question = re.sub(r"\s+", " ", question.lower().replace("’", "'").replace("ʼ", "'")).strip()
+    return question.rstrip(" ?!.…")
+
+
+def answer_key(doc_url: str, question: str, system: str) -> str:
+    """sha256 обрізаного PDF (ім'я файлу в pdfs.py) або посилання + хеш питання і промпту + версія."""
+    path = get_pdf_path(doc_url) if is_pdf_url(doc_url) else None
+    source = path.stem if path else "url-" + content_hash(doc_url.encode("utf-8"))
+    prompt = content_hash(f"{ANSWER_MODEL}\n{system}\n{normalize_question(question)}".encode("utf-8"))
+    return f"{source[:40]}-{prompt[:16]}-v{ANSWER_PROMPT_VERSION}"
+
+
+def read_answer(key: str) -> str | None:
+    return read_generated(ANSWERS_DIR, key, "answer")
+
+
+def write_answer(key: str, answer: str, doc_url: str, question: str):
+    write_generated(ANSWERS_DIR, key, "answer", answer, doc_url=doc_url, question=question,
+                    model=ANSWER_MODEL, prompt_version=ANSWER_PROMPT_VERSION)
+
+
+def replay_answer(answer: str):
+    """Готова відповідь як генератор фрагментів — для st.write_stream замість stream.text_stream."""
+    yield from re.findall(r"\S+\s*|\s+", answer)
+
+
+def generate_answer(api_messages: list, system: str) -> str | None:
+    """Відповідь без стріму (пакетна генерація). None — API недоступне, документ завеликий або llm.LLMBusy."""
+    try:
+        response = llm.create(
+            purpose="answer_batch",
+            path="text" if isinstance(api_messages[-1]["content"], str) else "pdf",
+            model=ANSWER_MODEL,
+            max_tokens=ANSWER_MAX_TOKENS,
+            system=system,
+            messages=api_messages,
+        )
+        return response.content[0].text.strip()
+    except Exception:
+        return None
+
+
+def answer_all(documents: list[str], questions: list[str], system: str, build_messages,
+               max_workers: int = MAX_CONCURRENCY) -> dict:
+    """
+    Пакетна генерація відповідей на questions для посилань documents. build_messages(doc_url, question) →
+    повідомлення API. Наявні відповіді пропускаються. Повертає {"created": n, "cached": n, "failed": n}.
+    """
+    def create(item):
+        doc_url, question = item
+        answer = generate_answer(build_messages(doc_url, question), system)
+        if answer:
+            write_answer(answer_key(doc_url, question, system), answer, doc_url, question)
+        return bool(answer)
+
+    items = [(doc_url, question) for doc_url in dict.fromkeys(documents) for question in questions]
+    return run_batch(items, lambda item: bool(read_answer(answer_key(*item, system))), create, max_workers)
+
+
+if __name__ == "__main__":
+    from data import ASSISTANT_SYSTEM_PROMPT
+    from pdfs import get_doc_text, open_pdf
+    from docs import PREMADE_QUESTIONS, build_api_messages
+
+    def build_messages(doc_url, question):
+        doc_text = get_doc_text(doc_url, question)
+        pdf_bytes = None if doc_text else open_pdf(doc_url)
+        return build_api_messages([{"role": "user", "text": question}], pdf_bytes, doc_text)
+
+    documents = load_matched_decisions()["doc_url"].tolist()
+    stats = answer_all(documents, PREMADE_QUESTIONS, ASSISTANT_SYSTEM_PROMPT, build_messages,
+                       max_workers=workers_arg(MAX_CONCURRENCY))
+    print(f"Відповідей: нових {stats['created']}, готових {stats['cached']}, з помилкою {stats['failed']}")
@@ -5,10 +5,12 @@ from ui import get_all_css
 page_home = st.Page("pages/home.py", title="Головна", default=True)
 page_reps = st.Page("pages/reps.py", title="Депутати")
 page_voting = st.Page("pages/voting.py", title="Результати голосувань")
+page_analytics = st.Page("pages/analytics.py", title="Аналітика голосувань")
 page_salaries = st.Page("pages/salaries.py", title="Зарплати")
+page_declarations = st.Page("pages/declarations.py", title="Декларації")
 # 2. Налаштування навігації
 pg = st.navigation({
-    "Київська міська рада": [page_home, page_reps, page_voting, page_salaries],
+    "Київська міська рада": [page_home, page_reps, page_voting, page_analytics, page_salaries, page_declarations],
 })
 
 # 3. Глобальний конфіг
@@ -24,6 +24,9 @@ SALARIES_URL = "https://data.gov.ua/dataset/0272e07e-53f7-4a93-ab21-5a227c6ca59c
 
 ASSISTANT_SYSTEM_PROMPT = Path("prompts/assistant.md").read_text(encoding="utf-8")
 
+# Локальне сховище попередньо обчислених даних (матриці голосів, індекси тощо)
+CACHE_DIR = Path("cache")
+
 # НАЗК — декларації
 NAZK_API = "https://public-api.nazk.gov.ua/v2"
 NAZK_PUBLIC = "https://public.nazk.gov.ua/documents"
@@ -46,3 +49,14 @@ SALARY_COMPONENTS = {
     "sickLeavesPfu": "Лікарняні ПФУ",
     "otherPay": "Інше",
 }
+
+# Курси для зведення декларацій: гривень за одиницю валюти (орієнтовно, за курсом НБУ).
+# Валюта, якої тут немає, у суми в гривнях не потрапляє
+FX_RATES = {
+    "UAH": 1.0,
+    "USD": 41.5,
+    "EUR": 48.0,
+    "GBP": 55.0,
+    "CHF": 51.5,
+    "PLN": 11.3,
+}
@@ -0,0 +1,297 @@
+"""
+declarations.py — зведена таблиця останніх декларацій усіх депутатів і зміни між деклараціями.
+
+Рядок на депутата: дохід, кількість і площа нерухомості, площа землі, транспорт, цінні папери,
+корпоративні права та гроші / зобов'язання за валютами (колонки cash_<валюта>, liabilities_<валюта>).
+Таблиця declaration_stats лежить у сховищі store.py; перебудова розбирає лише декларації, яких
+у ній ще немає (нова подача → новий uuid), решта рядків береться як є. Суми в гривнях рахуються
+вже при читанні за таблицею курсів, тож зміна курсів не потребує перебудови.
+
+Зміни рік до року: всі декларації депутата завантажуються паралельно, активи двох декларацій
+зіставляються за типом і площею / маркою й моделлю / емітентом (ASSET_KEYS), результат —
+додане, зникле, змінене плюс різниця доходу і грошей за валютами. Декларації незмінні, тож
+порівняння кешується для пари uuid без TTL.
+
+Запуск окремо: python declarations.py — оновлює declaration_stats (після prefetch.py це без запитів до API).
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from data import FX_RATES
+from downloads import MAX_WORKERS
+from store import connect, read_table, write_table
+from nazk import Declaration, get_declaration_list, load_declaration
+
+STATS_TABLE = "declaration_stats"
+CASH_PREFIX = "cash_"
+LIABILITIES_PREFIX = "liabilities_"
+
+
+def declaration_row(decl: Declaration) -> dict:
+    """Показники однієї декларації (без ідентифікації депутата)."""
+    return {
+        "year": decl.meta.year,
+        "total_income": decl.total_income,
+        "realty_count": len(decl.realty),
+        "realty_area": sum(r.area for r in decl.realty),
+        "land_area": sum(l.area for l in decl.land),
+        "vehicles_count": len(decl.vehicles),
+        "securities_count": len(decl.securities),
+        "corporate_rights_count": len(decl.corporate_rights),
+        **{f"{CASH_PREFIX}{cur}": amount for cur, amount in decl.cash_totals.items()},
+        **{f"{LIABILITIES_PREFIX}{cur}": amount for cur, amount in decl.liability_totals.items()},
+    }
+
+
+def build_declaration_stats(reps_df: pd.DataFrame, previous: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Остання декларація кожного депутата → рядок таблиці. Рядки previous з тим самим doc_id
+    беруться без повторного розбору. Депутати без знайденої декларації в таблицю не потрапляють.
+    """
+    known = {} if previous is None else {row["doc_id"]: row for row in previous.to_dict("records")}
+    rows = []
+    for dep in reps_df[['id', 'name', 'party']].itertuples(index=False):
+        declarations = get_declaration_list(dep.name, int(dep.id))
+        if not declarations:
+            continue
+        doc_id = declarations[0]["id"]
+        if doc_id in known:
+            row = {k: v for k, v in known[doc_id].items() if not (isinstance(v, float) and np.isnan(v))}
+        else:
+            decl = load_declaration(doc_id)
+            if decl is None:
+                continue
+            row = declaration_row(decl)
+        rows.append({**row, "deputy_id": int(dep.id), "name": dep.name, "party": dep.party, "doc_id": doc_id})
+    df = pd.DataFrame(rows)
+    money = [c for c in df.columns if c.startswith((CASH_PREFIX, LIABILITIES_PREFIX))]
+    df[money] = df[money].fillna(0.0)
+    return df
+
+
+def save_declaration_stats(reps_df: pd.DataFrame) -> pd.DataFrame:
+    """Перебудовує declaration_stats у сховищі (інкрементально відносно збереженої версії)."""
+    df = build_declaration_stats(reps_df, read_table(STATS_TABLE))
+    if df.empty:
+        return df
+    conn = connect()
+    write_table(conn, STATS_TABLE, df, primary_key=("deputy_id",), indexes=(("party",),))
+    conn.close()
+    return df
+
+
+def to_uah(df: pd.DataFrame, prefix: str, rates: dict = FX_RATES) -> pd.Series:
+    """Сума колонок <prefix><валюта> у гривнях одним множенням матриці на вектор курсів."""
+    columns = [c for c in df.columns if c.startswith(prefix) and c[len(prefix):] in rates]
+    if not columns:
+        return pd.Series(0.0, index=df.index)
+    fx = np.array([rates[c[len(prefix):]] for c in columns])
+    return pd.Series(df[columns].to_numpy(dtype=float) @ fx, index=df.index)
+
+
+def unconverted_currencies(df: pd.DataFrame, rates: dict = FX_RATES) -> list[str]:
+    """Валюти з ненульовими сумами, яких немає в таблиці курсів."""
+    currencies = set()
+    for prefix in (CASH_PREFIX, LIABILITIES_PREFIX):
+        currencies |= {c[len(prefix):] for c in df.columns if c.startswith(prefix) and df[c].any()}
+    return sorted(currencies - set(rates))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_declaration_stats(rates: dict = FX_RATES) -> pd.DataFrame:
+    """declaration_stats зі сховища + uah_cash, uah_liabilities, uah_net за курсами rates. Порожній DataFrame — таблиці ще немає."""
+    df = read_table(STATS_TABLE)
+    if df is None or df.empty:
+        return pd.DataFrame()
+    money = [c for c in df.columns if c.startswith((CASH_PREFIX, LIABILITIES_PREFIX))]
+    df[money] = df[money].fillna(0.0)
+    df["uah_cash"] = to_uah(df, CASH_PREFIX, rates)
+    df["uah_liabilities"] = to_uah(df, LIABILITIES_PREFIX, rates)
+    df["uah_net"] = df["uah_cash"] - df["uah_liabilities"]
+    return df
+
+
+# Розділ → (точний ключ, м'який ключ). Однаковий точний ключ — той самий актив (змінений, якщо
+# відрізняються інші поля); м'який ключ зіставляє решту (напр. та сама квартира з уточненою площею)
+ASSET_KEYS = {
+    "realty": (lambda r: (r.type, round(r.area, 1)), lambda r: r.type),
+    "land": (lambda l: (l.purpose, round(l.area, 1)), lambda l: l.purpose),
+    "vehicles": (lambda v: (v.brand.lower(), v.year), lambda v: v.brand.lower()),
+    "securities": (lambda s: (s.type, s.emitent), None),
+    "corporate_rights": (lambda c: (c.code or c.name), None),
+}
+
+SECTION_LABELS = {
+    "realty": "Нерухомість",
+    "land": "Земля",
+    "vehicles": "Транспорт",
+    "securities": "Цінні папери",
+    "corporate_rights": "Корпоративні права",
+}
+
+
+@dataclass(slots=True)
+class SectionDiff:
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    changed: list = field(default_factory=list)  # [(було, стало)]
+
+
+@dataclass(slots=True)
+class DeclarationDiff:
+    """Зміни від old до new: розділи активів, різниця доходу та сум за валютами (new − old)."""
+    old_year: int | None
+    new_year: int | None
+    sections: dict[str, SectionDiff]
+    income_delta: float
+    cash_deltas: dict[str, float]
+    liability_deltas: dict[str, float]
+
+
+def _align(old: list, new: list, key, loose_key=None) -> SectionDiff:
+    """Зіставляє два списки активів: спершу за точним ключем, решту — за м'яким."""
+    diff = SectionDiff()
+    buckets = {}
+    for item in old:
+        buckets.setdefault(key(item), []).append(item)
+    unmatched = []
+    for item in new:
+        bucket = buckets.get(key(item))
+        if bucket:
+            previous = bucket.pop()
+            if previous != item:
+                diff.changed.append((previous, item))
+        else:
+            unmatched.append(item)
+    leftover = [item for bucket in buckets.values() for item in bucket]
+    for item in unmatched:
+        match = next((o for o in leftover if loose_key and loose_key(o) == loose_key(item)), None)
+        if match is None:
+            diff.added.append(item)
+        else:
+            leftover.remove(match)
+            diff.changed.append((match, item))
+    diff.removed = leftover
+    return diff
+
+
+def _deltas(old: dict, new: dict) -> dict[str, float]:
+    return {cur: new.get(cur, 0.0) - old.get(cur, 0.0) for cur in sorted(set(old) | set(new))
+            if new.get(cur, 0.0) != old.get(cur, 0.0)}
+
+
+def compare_declarations(old: Declaration, new: Declaration) -> DeclarationDiff:
+    """Що змінилось між двома деклараціями (old — попередня)."""
+    return DeclarationDiff(
+        old_year=old.meta.year,
+        new_year=new.meta.year,
+        sections={
+            section: _align(getattr(old, section), getattr(new, section), key, loose_key)
+            for section, (key, loose_key) in ASSET_KEYS.items()
+        },
+        income_delta=new.total_income - old.total_income,
+        cash_deltas=_deltas(old.cash_totals, new.cash_totals),
+        liability_deltas=_deltas(old.liability_totals, new.liability_totals),
+    )
+
+
+def load_declarations(doc_ids: list[str]) -> dict[str, Declaration]:
+    """Кілька декларацій паралельно (кожна — load_declaration: сховище або API) → {uuid: Declaration}."""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        parsed = dict(zip(doc_ids, pool.map(load_declaration, doc_ids)))
+    return {doc_id: decl for doc_id, decl in parsed.items() if decl is not None}
+
+
+@st.cache_data(max_entries=1000, show_spinner=False)
+def _diff_declarations(old_id: str, new_id: str) -> DeclarationDiff:
+    loaded = load_declarations([old_id, new_id])
+    if old_id not in loaded or new_id not in loaded:
+        raise LookupError("декларація недоступна")
+    return compare_declarations(loaded[old_id], loaded[new_id])
+
+
+def diff_declarations(old_id: str, new_id: str) -> DeclarationDiff | None:
+    """Порівняння пари декларацій за uuid; кеш без TTL — подані декларації не змінюються. None (збій) не кешується."""
+    try:
+        return _diff_declarations(old_id, new_id)
+    except LookupError:
+        return None
+
+
+def previous_declaration(declarations: list[dict], doc_id: str) -> dict | None:
+    """Попередня декларація того ж типу (щорічна → попередня щорічна) зі списку get_declaration_list."""
+    current = next((d for d in declarations if d["id"] == doc_id), None)
+    if current is None:
+        return None
+    older = [d for d in declarations if (d["year"] or 0) < (current["year"] or 0)]
+    same_type = [d for d in older if d["type"] == current["type"]]
+    return (same_type or older or [None])[0]
+
+
+def _describe(section: str, item) -> str:
+    if section in ("realty", "land"):
+        name = item.type if section == "realty" else item.purpose or "Земельна ділянка"
+        details = [f"{item.area:g} м²" if item.area else "", item.ownership]
+        return ", ".join([name or "—", *filter(None, details)])
+    if section == "vehicles":
+        return f"{item.brand or '—'} {item.year}".strip()
+    if section == "securities":
+        return f"{item.type or '—'} {item.emitent}{f' ({item.amount:g} шт.)' if item.amount else ''}".strip()
+    return f"{item.name or '—'}{f', {item.share:g}%' if item.share else ''}"
+
+
+def show_declaration_changes(full_name: str, doc_id: str, deputy_id=None):
+    """
+    «Що змінилось» для показаної декларації порівняно з попередньою того ж типу. Як і сама декларація —
+    за кнопкою: тіло st.expander виконується навіть згорнутим, тож завантаження і порівняння не йдуть на кожну картку.
+    """
+    declarations = get_declaration_list(full_name, deputy_id)
+    previous = previous_declaration(declarations, doc_id)
+    if previous is None:
+        return
+    title = f"Що змінилось порівняно з {previous['year']} роком"
+    state_key = f"decl_changes_{doc_id}"
+
+    # Lazy: кнопка для першого завантаження
+    if state_key not in st.session_state:
+        if st.button(title, key=f"decl_changes_btn_{doc_id}", use_container_width=True):
+            st.session_state[state_key] = True
+            st.rerun()
+        return
+
+    with st.expander(title, expanded=True):
+        # Решта років вантажиться разом — перемикання року далі без очікування
+        load_declarations([d["id"] for d in declarations])
+        diff = diff_declarations(previous["id"], doc_id)
+        if diff is None:
+            st.caption("Не вдалось завантажити попередню декларацію.")
+            return
+
+        if diff.income_delta:
+            st.write(f"**Дохід (декларант):** {diff.income_delta:+,.0f} грн")
+        for title, deltas in (("Рахунки", diff.cash_deltas), ("Зобов'язання", diff.liability_deltas)):
+            if deltas:
+                st.write(f"**{title}:** " + ", ".join(f"{amount:+,.0f} {cur}" for cur, amount in deltas.items()))
+
+        for section, section_diff in diff.sections.items():
+            lines = [f"+ {_describe(section, item)}" for item in section_diff.added]
+            lines += [f"− {_describe(section, item)}" for item in section_diff.removed]
+            lines += [f"~ {_describe(section, old)} → {_describe(section, new)}" for old, new in section_diff.changed]
+            if lines:
+                st.write(f"**{SECTION_LABELS[section]}**")
+                for line in lines:
+                    st.write(line)
+
+        if not (diff.income_delta or diff.cash_deltas or diff.liability_deltas
+                or any(d.added or d.removed or d.changed for d in diff.sections.values())):
+            st.caption("Суттєвих змін не знайдено.")
+
+
+if __name__ == "__main__":
+    from utils import load_deputies
+
+    df = save_declaration_stats(load_deputies())
+    print(f"Декларацій у зведенні: {len(df)}")
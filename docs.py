@@ -6,89 +6,194 @@ docs.py — пошук офіційних документів за голосу
 """
 
 import io
+import time
+import mmap
 import re
 import base64
 import requests
+import numpy as np
 import pandas as pd
 import streamlit as st
-import anthropic
-from pypdf import PdfReader, PdfWriter
-from data import UA, COUNCIL_DECISIONS, ASSISTANT_SYSTEM_PROMPT
-
-PDF_MAX_PAGES = 20
-
-
-def _truncate_pdf(pdf_bytes: bytes) -> bytes:
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    if len(reader.pages) <= PDF_MAX_PAGES:
-        return pdf_bytes
-    writer = PdfWriter()
-    for page in reader.pages[:PDF_MAX_PAGES]:
-        writer.add_page(page)
-    out = io.BytesIO()
-    writer.write(out)
-    return out.getvalue()
+from pathlib import Path
+from data import UA, COUNCIL_DECISIONS, ASSISTANT_SYSTEM_PROMPT, CACHE_DIR
+from store import read_table
+from pdfs import open_pdf, get_doc_text
+from summaries import get_or_create_summary
+import llm
+from metrics import record
+from answers import ANSWER_MODEL, ANSWER_MAX_TOKENS, answer_key, read_answer, write_answer, replay_answer
+from utils import content_hash, atomic_path
+
+MATCH_MIN_SCORE = 0.65  # нижче — рішення за назвою вважається не знайденим
+LINKS_DIR = CACHE_DIR / "links"
+LINK_COLUMNS = ["filename", "gl_text", "legalActNum", "title", "date_accepted", "doc_url", "score"]
+
+
+DECISION_COLUMNS = ["legalActNum", "title", "date_accepted", "pdf_url"]
+
+
+def parse_council_decisions(content: bytes) -> pd.DataFrame:
+    """Excel рішень ради → legalActNum, title, date_accepted, pdf_url. Використовується також в etl.py."""
+    df = pd.read_excel(io.BytesIO(content))
+    df = df.rename(columns={"legalActDateAccepted": "date_accepted", "url": "pdf_url"})
+    if "pdf_url" in df.columns:
+        df["pdf_url"] = df["pdf_url"].str.replace(
+            "https://kmr.gov.ua/", "https://old.kmr.gov.ua/", regex=False
+        )
+    keep = [c for c in DECISION_COLUMNS if c in df.columns]
+    return df[keep].copy()
 
 
 @st.cache_data(ttl=86400, show_spinner=False)
 def load_council_decisions(council: str) -> pd.DataFrame:
+    stored = read_table("council_decisions", where="council = ?", params=(council,), parse_dates=("date_accepted",))
+    if stored is not None and not stored.empty:
+        return stored.drop(columns=["council", "source"])
     sources = COUNCIL_DECISIONS.get(council, {})
     frames = []
     for key, url in sources.items():
         try:
             r = requests.get(url, headers=UA, timeout=30)
             r.raise_for_status()
-            df = pd.read_excel(io.BytesIO(r.content))
-            df = df.rename(columns={"legalActDateAccepted": "date_accepted", "url": "pdf_url"})
-            if "pdf_url" in df.columns:
-                df["pdf_url"] = df["pdf_url"].str.replace(
-                    "https://kmr.gov.ua/", "https://old.kmr.gov.ua/", regex=False
-                )
-            keep = [c for c in ["legalActNum", "title", "date_accepted", "pdf_url"] if c in df.columns]
-            frames.append(df[keep].copy())
+            frames.append(parse_council_decisions(r.content))
         except Exception:
             continue
     if not frames:
-        return pd.DataFrame(columns=["legalActNum", "title", "date_accepted", "pdf_url"])
+        return pd.DataFrame(columns=DECISION_COLUMNS)
     return pd.concat(frames, ignore_index=True)
 
 
-def find_doc(gl_text: str, council: str = "kyiv") -> dict | None:
-    df = load_council_decisions(council)
-    if df.empty:
-        return None
+@st.cache_resource(ttl=86400, show_spinner=False)
+def load_decision_index(council: str) -> dict:
+    """
+    Інвертований індекс назв рішень ради для find_doc / find_docs:
+        vocab    — {слово: номер}
+        postings — для кожного слова масив рядків df, де воно є в назві
+        sizes    — кількість різних слів у назві кожного рядка
+        by_num   — {legalActNum: перший рядок} для точного збігу
+        key      — хеш набору рішень (для файлів LINKS_DIR)
+    """
+    df = load_council_decisions(council).reset_index(drop=True)
+    titles = df["title"].fillna("").astype(str) if "title" in df.columns else pd.Series(dtype=str)
+    vocab, postings, sizes = {}, [], []
+    for row, title in enumerate(titles):
+        words = _title_words(title)
+        sizes.append(len(words))
+        for word in words:
+            term = vocab.setdefault(word, len(vocab))
+            if term == len(postings):
+                postings.append([])
+            postings[term].append(row)
+    nums = df["legalActNum"].astype(str) if "legalActNum" in df.columns else pd.Series(dtype=str)
+    return {
+        "key": content_hash(df[[c for c in ["legalActNum", "title"] if c in df.columns]].to_json().encode("utf-8"))[:12],
+        "df": df,
+        "vocab": vocab,
+        "postings": [np.array(p, dtype=np.int32) for p in postings],
+        "sizes": np.array(sizes, dtype=np.int32),
+        "by_num": {num: row for row, num in reversed(list(enumerate(nums)))},
+    }
+
+
+def _match_decision(index: dict, gl_text: str) -> tuple[int, float] | None:
+    """Назва питання → (рядок df, score) найкращого рішення або None (без порогу MATCH_MIN_SCORE)."""
     final_num = _extract_final_num(gl_text)
-    if final_num:
-        exact = df[df["legalActNum"] == final_num]
-        if not exact.empty:
-            return _row_to_dict(exact.iloc[0], score=1.0)
+    if final_num and final_num in index["by_num"]:
+        return index["by_num"][final_num], 1.0
     title = _extract_title(gl_text)
     if not title or len(title) < 10 or not title.lower().startswith("про"):
         return None
-    best_score, best_row = 0.0, None
-    for _, row in df.iterrows():
-        score = _word_similarity(title, str(row.get("title", "")))
-        if score > best_score:
-            best_score, best_row = score, row
-    if best_score < 0.65 or best_row is None:
+    words = _title_words(title)
+    terms = [index["vocab"][w] for w in words if w in index["vocab"]]
+    if not terms:
         return None
-    return _row_to_dict(best_row, score=best_score)
+    # Схожість = |спільні слова| / min(|слова питання|, |слова рішення|) — для всіх рішень одразу
+    common = np.bincount(np.concatenate([index["postings"][t] for t in terms]), minlength=len(index["sizes"]))
+    scores = common / np.maximum(np.minimum(len(words), index["sizes"]), 1)
+    row = int(np.argmax(scores))
+    return row, float(scores[row])
+
+
+def find_docs(gl_texts: list[str], council: str = "kyiv", min_score: float = MATCH_MIN_SCORE) -> list[dict | None]:
+    """Пакетний find_doc: один індекс на всі питання (напр. весь архів) → [рішення або None] у тому ж порядку."""
+    index = load_decision_index(council)
+    if index["df"].empty:
+        return [None] * len(gl_texts)
+    results = []
+    for gl_text in gl_texts:
+        match = _match_decision(index, gl_text)
+        if match is None or match[1] < min_score:
+            results.append(None)
+        else:
+            results.append(_row_to_dict(index["df"].iloc[match[0]], score=match[1]))
+    return results
+
+
+def find_doc(gl_text: str, council: str = "kyiv") -> dict | None:
+    return find_docs([gl_text], council)[0]
+
+
+def build_decision_links(title_index: list[dict], council: str = "kyiv") -> pd.DataFrame:
+    """
+    Усі питання архіву (votes.build_title_index) → найкраще рішення для кожного одним проходом.
+    Зберігаються й збіги нижче MATCH_MIN_SCORE (для ручної перевірки); без кандидата — score 0.
+    """
+    matches = find_docs([entry["gl_text"] for entry in title_index], council, min_score=0.0)
+    return pd.DataFrame([
+        {"filename": entry["filename"], "gl_text": entry["gl_text"], **(match or {"score": 0.0})}
+        for entry, match in zip(title_index, matches)
+    ], columns=LINK_COLUMNS)
+
+
+def get_decision_links_path(archive_key: str, council: str = "kyiv") -> Path:
+    """Файл таблиці зв'язків: хеш архіву + хеш набору рішень ради, тож нові рішення дають нову таблицю."""
+    return LINKS_DIR / f"{archive_key[:24]}-{council}-{load_decision_index(council)['key']}.parquet"
+
+
+def save_decision_links(archive_key: str, title_index: list[dict], council: str = "kyiv") -> pd.DataFrame:
+    """build_decision_links із збереженням у LINKS_DIR; якщо таблиця вже є — читає її."""
+    path = get_decision_links_path(archive_key, council)
+    if path.exists():
+        return pd.read_parquet(path)
+    links_df = build_decision_links(title_index, council)
+    with atomic_path(path) as tmp_path:
+        links_df.to_parquet(tmp_path, index=False)
+    return links_df
+
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def load_decision_links(archive_key: str, _title_index: list[dict], council: str = "kyiv") -> dict[str, dict]:
+    """{filename: рішення} для впевнених збігів архіву (score ≥ MATCH_MIN_SCORE) — для render_doc_buttons."""
+    links_df = save_decision_links(archive_key, _title_index, council)
+    confident = links_df[links_df["score"] >= MATCH_MIN_SCORE]
+    return {
+        row["filename"]: {k: row[k] for k in ["legalActNum", "title", "date_accepted", "doc_url", "score"]}
+        for row in confident.to_dict("records")
+    }
+
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def fetch_pdf_bytes(url: str) -> mmap.mmap | None:
+    """Обрізаний PDF рішення зі сховища pdfs.py (memory-map, спільний для всіх сесій) або None."""
+    return open_pdf(url)
 
 
 @st.cache_data(ttl=3600, show_spinner=False)
-def fetch_pdf_bytes(url: str) -> bytes | None:
-    try:
-        r = requests.get(url, headers=UA, timeout=30)
-        r.raise_for_status()
-        return _truncate_pdf(r.content)
-    except Exception:
-        return None
+def fetch_doc_text(url: str, question: str) -> str | None:
+    """Сторінки тексту рішення, релевантні питанню (pdfs.get_doc_text), або None — скан без тексту чи немає PDF."""
+    return get_doc_text(url, question)
 
 
-def build_api_messages(messages: list, pdf_bytes: bytes | None) -> list:
+def build_api_messages(messages: list, pdf_bytes: bytes | None, doc_text: str | None = None) -> list:
+    """
+    Історія чату → повідомлення API. doc_text (вибрані сторінки) додається до останнього питання;
+    pdf_bytes — лише для сканів без текстового шару, як документ у першому повідомленні.
+    """
     result = []
     for i, msg in enumerate(messages):
-        if msg["role"] == "user" and i == 0 and pdf_bytes:
+        if msg["role"] == "user" and i == len(messages) - 1 and doc_text:
+            result.append({"role": "user", "content": f"Фрагменти тексту рішення:\n\n{doc_text}\n\nПитання: {msg['text']}"})
+        elif msg["role"] == "user" and i == 0 and pdf_bytes and not doc_text:
             result.append({"role": "user", "content": [
                 {
                     "type": "document",
@@ -107,51 +212,24 @@ def build_api_messages(messages: list, pdf_bytes: bytes | None) -> list:
 
 
 @st.cache_data(ttl=86400, show_spinner=False)
+def _load_doc_summary(doc_url: str, title: str) -> str:
+    return get_or_create_summary(doc_url, title)
+
+
 def get_doc_summary(doc_url: str, title: str) -> str:
-    pdf_bytes = (
-        fetch_pdf_bytes(doc_url)
-        if doc_url.endswith(".pdf") or "old.kmr.gov.ua" in doc_url
-        else None
-    )
-    client = anthropic.Anthropic(api_key=st.secrets["ANTHROPIC_API_KEY"])
-    if pdf_bytes:
-        content = [
-            {
-                "type": "document",
-                "source": {
-                    "type": "base64",
-                    "media_type": "application/pdf",
-                    "data": base64.standard_b64encode(pdf_bytes).decode(),
-                },
-                "cache_control": {"type": "ephemeral"},
-            },
-            {"type": "text", "text": "Одним-двома реченнями поясни суть цього рішення. Тільки звичайний текст — без заголовків, без назви рішення, без емодзі, без списків."},
-        ]
-    else:
-        content = f'Одним-двома реченнями поясни суть рішення з назвою: «{title}». Тільки звичайний текст — без заголовків, без назви рішення, без емодзі, без списків.'
+    """
+    Огляд рішення: готовий зі сховища summaries.py, інакше генерується наживо і зберігається.
+    LLMBusy чи збій API — SUMMARY_UNAVAILABLE, який не кешується: наступний показ спробує знову.
+    """
     try:
-        response = client.messages.create(
-            model="claude-haiku-4-5",
-            system="Ти — редактор, який пише чистою літературною українською мовою без русизмів і суржику. Відповідай виключно українською.",
-            max_tokens=150,
-            messages=[{"role": "user", "content": content}],
-        )
-        return response.content[0].text.strip()
+        return _load_doc_summary(doc_url, title)
     except Exception:
-        if pdf_bytes:
-            try:
-                response = client.messages.create(
-                    model="claude-haiku-4-5",
-                    system="Ти — редактор, який пише чистою літературною українською мовою без русизмів і суржику. Відповідай виключно українською.",
-                    max_tokens=150,
-                    messages=[{"role": "user", "content": f'Одним-двома реченнями поясни суть рішення з назвою: «{title}». Тільки звичайний текст — без заголовків, без назви рішення, без емодзі, без списків.'}],
-                )
-                return response.content[0].text.strip()
-            except Exception:
-                pass
-        return "Документ завеликий для автоматичного аналізу — ознайомтесь з оригіналом за посиланням нижче."
+        return SUMMARY_UNAVAILABLE
 
 
+LLM_BUSY_MESSAGE = "Зараз забагато запитів до асистента — спробуйте за хвилину. Поки що — короткий огляд рішення:"
+SUMMARY_UNAVAILABLE = "Огляд зараз недоступний — спробуйте за хвилину або ознайомтесь з оригіналом за посиланням нижче."
+
 PREMADE_QUESTIONS = [
     "Поясни мені це рішення простими словами",
     "Допоможи написати звернення до КМДА, стосовно цього рішення",
@@ -159,9 +237,9 @@ PREMADE_QUESTIONS = [
 ]
 
 
-def render_doc_buttons(gl_text: str, council: str = "kyiv", passed: bool = True):
-    """Контейнер з назвою, саммері, кнопками та вбудованим чатом."""
-    result = find_doc(gl_text, council)
+def render_doc_buttons(gl_text: str, council: str = "kyiv", passed: bool = True, result: dict | None = None):
+    """Контейнер з назвою, саммері, кнопками та вбудованим чатом. result — готовий збіг з load_decision_links."""
+    result = result or find_doc(gl_text, council)
     if not result:
         return
 
@@ -193,25 +271,36 @@ def render_doc_buttons(gl_text: str, council: str = "kyiv", passed: bool = True)
             messages.append({"role": "user", "text": pending})
             with st.chat_message("user"):
                 st.write(pending)
-            pdf_bytes = (
-                fetch_pdf_bytes(result["doc_url"])
-                if result["doc_url"].endswith(".pdf") or "old.kmr.gov.ua" in result["doc_url"]
-                else None
-            )
-            api_messages = build_api_messages(messages, pdf_bytes)
-            client = anthropic.Anthropic(api_key=st.secrets["ANTHROPIC_API_KEY"])
+            # Перше питання не залежить від історії — відповідь спільна для всіх сесій
+            key = answer_key(result["doc_url"], pending, ASSISTANT_SYSTEM_PROMPT) if len(messages) == 1 else None
+            cached = read_answer(key) if key else None
             with st.chat_message("assistant"):
-                try:
-                    with client.messages.stream(
-                        model="claude-haiku-4-5",
-                        max_tokens=1024,
-                        system=ASSISTANT_SYSTEM_PROMPT,
-                        messages=api_messages,
-                    ) as stream:
-                        response_text = st.write_stream(stream.text_stream)
-                except Exception:
-                    response_text = "Документ завеликий для аналізу. Ознайомтесь з оригіналом за посиланням вище."
-                    st.write(response_text)
+                if cached:
+                    started = time.perf_counter()
+                    response_text = st.write_stream(replay_answer(cached))
+                    record("chat", "answer_cache", latency_ms=(time.perf_counter() - started) * 1000)
+                else:
+                    doc_text = fetch_doc_text(result["doc_url"], pending)
+                    pdf_bytes = None if doc_text else fetch_pdf_bytes(result["doc_url"])
+                    api_messages = build_api_messages(messages, pdf_bytes, doc_text)
+                    try:
+                        with llm.stream(
+                            purpose="chat",
+                            path="text" if doc_text else "pdf" if pdf_bytes else "history",
+                            model=ANSWER_MODEL,
+                            max_tokens=ANSWER_MAX_TOKENS,
+                            system=ASSISTANT_SYSTEM_PROMPT,
+                            messages=api_messages,
+                        ) as text_stream:
+                            response_text = st.write_stream(text_stream)
+                        if key:
+                            write_answer(key, response_text, result["doc_url"], pending)
+                    except llm.LLMBusy:
+                        response_text = f"{LLM_BUSY_MESSAGE}\n\n{get_doc_summary(result['doc_url'], result['title'])}"
+                        st.write(response_text)
+                    except Exception:
+                        response_text = "Документ завеликий для аналізу. Ознайомтесь з оригіналом за посиланням вище."
+                        st.write(response_text)
             messages.append({"role": "assistant", "text": response_text})
             st.rerun()
 
@@ -251,12 +340,8 @@ def _extract_final_num(gl_text: str) -> str | None:
     return m.group(1) if m else None
 
 
-def _word_similarity(a: str, b: str) -> float:
-    wa = set(re.findall(r"[а-яґєіїА-ЯҐЄІЇ']+", a.lower()))
-    wb = set(re.findall(r"[а-яґєіїА-ЯҐЄІЇ']+", b.lower()))
-    if not wa or not wb:
-        return 0.0
-    return len(wa & wb) / min(len(wa), len(wb))
+def _title_words(text: str) -> set[str]:
+    return set(re.findall(r"[а-яґєіїА-ЯҐЄІЇ']+", text.lower()))
 
 
 def _row_to_dict(row: pd.Series, score: float) -> dict:
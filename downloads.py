@@ -0,0 +1,223 @@
+"""
+downloads.py — паралельне завантаження джерел даних у content-addressed кеш на диску.
+
+Файли зберігаються в CACHE_DIR/downloads/blobs/<sha256 вмісту>, поруч — метадані для кожного URL
+(meta/<sha256 URL>.json: хеш вмісту, ETag, Last-Modified). Перервані завантаження дописуються
+через HTTP Range, повторні — перевіряються умовним запитом (If-None-Match / If-Modified-Since).
+Один URL одночасно качає лише один писач (fcntl-замок partial/<ключ>.lock між потоками і процесами:
+фонове оновлення, сесії Streamlit, etl.py), тож .part не дописують двоє і не докачують з чужого зміщення.
+
+Запуск окремо: python downloads.py — завантажує/оновлює всі архіви VOTING_QUARTERS.
+"""
+
+import os
+import json
+import fcntl
+import hashlib
+import requests
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from data import CACHE_DIR, UA, VOTING_QUARTERS
+from utils import write_json
+
+DOWNLOADS_DIR = CACHE_DIR / "downloads"
+BLOBS_DIR = DOWNLOADS_DIR / "blobs"
+META_DIR = DOWNLOADS_DIR / "meta"
+PARTIAL_DIR = DOWNLOADS_DIR / "partial"
+
+CHUNK_SIZE = 1 << 16
+TIMEOUT = (10, 60)  # з'єднання, читання між шматками
+MAX_WORKERS = 4
+TIME_FORMAT = "%Y-%m-%d %H:%M UTC"
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _read_json(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_meta(url: str) -> dict:
+    """Метадані останнього успішного завантаження URL (sha256, etag, last_modified, size, fetched_at) або {}."""
+    return _read_json(META_DIR / f"{_url_key(url)}.json")
+
+
+def cached_path(url: str) -> Path | None:
+    """Шлях до локальної копії URL без звернення до мережі, або None."""
+    sha = get_meta(url).get("sha256")
+    path = BLOBS_DIR / sha if sha else None
+    return path if path and path.exists() else None
+
+
+def is_fresh(url: str, max_age: timedelta) -> bool:
+    """Локальна копія перевірялась на сервері не пізніше max_age тому — можна не робити умовний запит."""
+    checked_at = get_meta(url).get("checked_at")
+    if not checked_at or cached_path(url) is None:
+        return False
+    checked = datetime.strptime(checked_at, TIME_FORMAT).replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - checked < max_age
+
+
+def read_cached(url: str) -> bytes | None:
+    path = cached_path(url)
+    return path.read_bytes() if path else None
+
+
+@contextmanager
+def _url_lock(key: str, wait: bool):
+    """
+    Ексклюзивний замок на URL → True, або False, якщо wait=False і URL уже качає інший писач.
+    flock тримається на окремому відкритому файлі, тож розділяє і потоки одного процесу.
+    """
+    PARTIAL_DIR.mkdir(parents=True, exist_ok=True)
+    with open(PARTIAL_DIR / f"{key}.lock", "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def fetch(url: str, validate=None, timeout=TIMEOUT, max_bytes: int | None = None) -> Path | None:
+    """
+    Завантажує URL у кеш і повертає шлях до локального файлу.
+    - є локальна копія → умовний запит; 304 → та сама копія без завантаження
+    - є недокачаний .part → докачування з Range/If-Range
+    - validate(перші байти) → False: відповідь відкидається (напр. HTML-сторінка помилки замість ZIP)
+    - max_bytes: файл більший за ліміт не докачується (перевірка Content-Length і під час читання)
+    При мережевій помилці повертає попередню копію, якщо вона є.
+    Якщо URL уже качає інший писач: є локальна копія — вона й повертається, немає — чекаємо на нього.
+    """
+    key = _url_key(url)
+    existing = cached_path(url)
+    with _url_lock(key, wait=existing is None) as locked:
+        if not locked:
+            return existing
+        return _fetch_locked(url, key, validate, timeout, max_bytes)
+
+
+def _fetch_locked(url: str, key: str, validate, timeout, max_bytes: int | None) -> Path | None:
+    meta = get_meta(url)
+    existing = cached_path(url)
+    part_path = PARTIAL_DIR / f"{key}.part"
+    part_meta_path = PARTIAL_DIR / f"{key}.json"
+
+    headers = dict(UA)
+    if existing:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    part_meta = _read_json(part_meta_path)
+    if offset and part_meta.get("validator"):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = part_meta["validator"]
+    else:
+        offset = 0
+
+    try:
+        with requests.get(url, headers=headers, timeout=timeout, stream=True) as r:
+            if r.status_code == 304 and existing:
+                write_json(META_DIR / f"{key}.json", {**meta, "checked_at": _now()}, indent=2)
+                return existing
+            if r.status_code not in (200, 206):
+                if offset:
+                    part_path.unlink(missing_ok=True)  # напр. 416 — наступна спроба почне з нуля
+                return existing
+            if r.status_code == 200:
+                offset = 0  # сервер ігнорує Range або файл змінився — качаємо з початку
+            length = offset + int(r.headers.get("Content-Length") or 0)
+            if max_bytes and length > max_bytes:
+                part_path.unlink(missing_ok=True)
+                return existing
+
+            validator = r.headers.get("ETag") or r.headers.get("Last-Modified")
+            PARTIAL_DIR.mkdir(parents=True, exist_ok=True)
+            write_json(part_meta_path, {"url": url, "validator": validator}, indent=2)
+            size = offset
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if max_bytes and size > max_bytes:
+                        break
+                    f.write(chunk)
+            if max_bytes and size > max_bytes:
+                part_path.unlink(missing_ok=True)
+                part_meta_path.unlink(missing_ok=True)
+                return existing
+            response_headers = r.headers
+    except requests.RequestException:
+        return existing
+
+    with open(part_path, "rb") as f:
+        head = f.read(CHUNK_SIZE)
+    if validate and not validate(head):
+        part_path.unlink(missing_ok=True)
+        part_meta_path.unlink(missing_ok=True)
+        return existing
+
+    digest = hashlib.sha256()
+    with open(part_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    sha = digest.hexdigest()
+
+    BLOBS_DIR.mkdir(parents=True, exist_ok=True)
+    blob_path = BLOBS_DIR / sha
+    os.replace(part_path, blob_path)
+    part_meta_path.unlink(missing_ok=True)
+    write_json(META_DIR / f"{key}.json", {
+        "url": url,
+        "sha256": sha,
+        "etag": response_headers.get("ETag"),
+        "last_modified": response_headers.get("Last-Modified"),
+        "size": blob_path.stat().st_size,
+        "fetched_at": _now(),
+        "checked_at": _now(),
+    }, indent=2)
+    return blob_path
+
+
+def fetch_all(urls: list[str], validate=None, max_workers: int = MAX_WORKERS) -> dict[str, Path | None]:
+    """Паралельне fetch() для списку URL → {url: шлях або None}."""
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        paths = pool.map(lambda u: fetch(u, validate=validate), urls)
+        return dict(zip(urls, paths))
+
+
+def is_zip(head: bytes) -> bool:
+    return head[:2] == b"PK"
+
+
+def sync_voting_archives() -> dict[str, Path | None]:
+    """Завантажує/перевіряє всі архіви VOTING_QUARTERS паралельно."""
+    return fetch_all(list(VOTING_QUARTERS.values()), validate=is_zip)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime(TIME_FORMAT)
+
+
+if __name__ == "__main__":
+    results = sync_voting_archives()
+    for quarter, url in VOTING_QUARTERS.items():
+        path = results.get(url)
+        print(f"  {'✓' if path else '✗'} {quarter}: {path.name[:12] if path else 'не завантажено'}")
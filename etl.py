@@ -0,0 +1,212 @@
+"""
+etl.py — офлайн-наповнення локального сховища (store.py) з усіх джерел data.py.
+
+Таблиці:
+    deputies           — таблиця депутатів (parse_deputies)
+    salaries           — зарплати керівництва КМДА (parse_salaries)
+    council_decisions  — рішення рад з COUNCIL_DECISIONS (parse_council_decisions)
+    vote_questions     — питання всіх архівів VOTING_QUARTERS з підсумками голосів
+    votes              — поіменні голоси «питання × депутат» (без відсутніх)
+    deputy_profiles    — профілі голосувань депутатів по всіх кварталах (analytics.save_deputy_profiles)
+    decision_links     — питання → рішення ради з оцінкою збігу (confident = score ≥ MATCH_MIN_SCORE)
+    nazk_searches / nazk_documents — сирі відповіді API НАЗК (лише з --nazk)
+    declaration_stats  — зведення останніх декларацій депутатів (declarations.py, лише з --nazk)
+    sources            — звідки і коли завантажено кожне джерело
+
+Поза сховищем — пошуковий індекс назв усіх архівів (search.save_search_index, CACHE_DIR/search)
+і аналітика блоків голосувань (analytics.save_voting_blocs, CACHE_DIR/blocs), а також
+мініатюри фото депутатів з маніфестом (thumbnails.py, static/avatars).
+
+Файли качаються через downloads.fetch (content-addressed кеш, умовні запити), тож повторний
+запуск без змін у джерелах мережу майже не навантажує. Джерело, яке не вдалося завантажити,
+лишає в сховищі попередню версію своєї таблиці.
+
+Запуск окремо: python etl.py [--nazk]
+"""
+
+import sys
+import asyncio
+import pandas as pd
+from datetime import datetime, timezone
+from data import DEPUTIES_URL, SALARIES_URL, COUNCIL_DECISIONS, VOTING_QUARTERS, SALARY_COMPONENTS
+from downloads import fetch_all, get_meta, sync_voting_archives
+from store import connect, read_table, write_table, write_documents
+from utils import parse_deputies, parse_salaries
+from docs import MATCH_MIN_SCORE, parse_council_decisions, save_decision_links
+from prefetch import prefetch_declarations
+from search import save_search_index
+from analytics import save_deputy_profiles, save_voting_blocs
+from declarations import save_declaration_stats
+from thumbnails import build_thumbnails, write_manifest
+from votes import VOTE_CODES, ABSENT, get_reps_lookup, build_title_index, build_vote_matrix, load_vote_matrix
+
+
+def etl_deputies(conn, path) -> pd.DataFrame:
+    df = parse_deputies(path.read_bytes())
+    df = df[['id', 'name', 'party', 'address', 'phone', 'district']].copy()
+    df['id'] = df['id'].astype(int)
+    write_table(conn, "deputies", df, primary_key=("id",), indexes=(("party",), ("district",)))
+    return df
+
+
+def etl_salaries(conn, path) -> int:
+    df = parse_salaries(path.read_text(encoding="utf-8"))
+    pay_types = {col: "REAL" for col in [*SALARY_COMPONENTS, "total"]}
+    write_table(conn, "salaries", df, indexes=(("employeeName",), ("date",)), types=pay_types)
+    return len(df)
+
+
+def etl_decisions(conn, paths: dict) -> int:
+    """paths — {(рада, півріччя): файл}; таблиця одна на всі ради (колонки council, source)."""
+    frames = []
+    for (council, key), path in paths.items():
+        df = parse_council_decisions(path.read_bytes())
+        if "date_accepted" in df.columns:
+            df["date_accepted"] = pd.to_datetime(df["date_accepted"], errors="coerce")
+        frames.append(df.assign(council=council, source=key))
+    df = pd.concat(frames, ignore_index=True)
+    write_table(conn, "council_decisions", df, indexes=(("council", "legalActNum"),))
+    return len(df)
+
+
+def etl_votes(conn, paths: dict, reps_df: pd.DataFrame) -> int:
+    """paths — {квартал: ZIP}. Матриці будуються через votes.build_vote_matrix (і лишаються на диску для сторінок)."""
+    reps_lookup = get_reps_lookup(reps_df)
+    question_frames, vote_frames = [], []
+    for quarter, path in paths.items():
+        matrix, rows_df, questions_df = load_vote_matrix(str(build_vote_matrix(path.read_bytes(), reps_lookup)))
+        archive = path.name
+        question_frames.append(questions_df.assign(quarter=quarter, archive=archive))
+        r, c = (matrix != ABSENT).nonzero()
+        vote_frames.append(pd.DataFrame({
+            "archive": archive,
+            "col": c,
+            "deputy_id": rows_df['id'].to_numpy()[r],
+            "full_name": rows_df['full_name'].to_numpy()[r],
+            "party": rows_df['party'].to_numpy()[r],
+            "vote": matrix[r, c].astype(int),
+        }))
+    questions = pd.concat(question_frames, ignore_index=True)
+    votes = pd.concat(vote_frames, ignore_index=True)
+    count_types = {label: "INTEGER" for label in VOTE_CODES}
+    write_table(conn, "vote_questions", questions, primary_key=("archive", "col"),
+                indexes=(("quarter",), ("date",)), types=count_types)
+    write_table(conn, "votes", votes, indexes=(("archive", "col"), ("deputy_id",)), types={"deputy_id": "INTEGER"})
+    return len(votes)
+
+
+def etl_deputy_profiles(conn, paths: dict, reps_df: pd.DataFrame) -> int:
+    """Профілі по матрицях усіх кварталів (у порядку VOTING_QUARTERS) — сторінка депутатів їх лише читає."""
+    reps_lookup = get_reps_lookup(reps_df)
+    profiles = save_deputy_profiles([build_vote_matrix(path.read_bytes(), reps_lookup) for path in paths.values()])
+    write_table(conn, "deputy_profiles", profiles, primary_key=("id",))
+    return len(profiles)
+
+
+def etl_voting_blocs(paths: dict, reps_df: pd.DataFrame) -> int:
+    """Згуртованість фракцій і збіги голосів по матрицях усіх кварталів — сторінка аналітики їх лише читає."""
+    reps_lookup = get_reps_lookup(reps_df)
+    cohesion_df, _ = save_voting_blocs([build_vote_matrix(path.read_bytes(), reps_lookup) for path in paths.values()])
+    return len(cohesion_df)
+
+
+def etl_decision_links(conn, paths: dict) -> int:
+    """Зв'язки «питання → рішення» для всіх архівів; збіги нижче MATCH_MIN_SCORE лишаються в таблиці для перевірки."""
+    frames = []
+    for council in COUNCIL_DECISIONS:
+        for quarter, path in paths.items():
+            links_df = save_decision_links(path.name, build_title_index(path.read_bytes()), council)
+            frames.append(links_df.assign(council=council, quarter=quarter, archive=path.name))
+    links = pd.concat(frames, ignore_index=True)
+    links["confident"] = links["score"] >= MATCH_MIN_SCORE
+    write_table(conn, "decision_links", links, primary_key=("council", "archive", "filename"),
+                indexes=(("legalActNum",), ("score",)))
+    return len(links)
+
+
+def etl_search_index(paths: dict) -> int:
+    """Один пошуковий індекс назв усіх архівів (ключ архіву — sha256 вмісту, як на сторінці голосувань)."""
+    raw = save_search_index({path.name: build_title_index(path.read_bytes()) for path in paths.values()})
+    return len(raw["docs"])
+
+
+def etl_thumbnails() -> int:
+    """Мініатюри фото і маніфест — картки депутатів без маніфесту показують лише ініціали."""
+    avatars = build_thumbnails()
+    write_manifest(avatars)
+    return len(avatars)
+
+
+def etl_declarations(conn, reps_df: pd.DataFrame) -> int:
+    """Пошук НАЗК для кожного депутата + повний текст останньої декларації (те, що сторінка відкриває першим)."""
+    searches, documents, known = asyncio.run(prefetch_declarations(reps_df['name'], latest_only=True))
+    write_documents(conn, "nazk_searches", searches)
+    write_documents(conn, "nazk_documents", documents)
+    return len(documents) + known
+
+
+def run(nazk: bool = False) -> dict:
+    """Завантажує всі джерела і перезаписує таблиці сховища. Повертає {джерело: кількість рядків або помилка}."""
+    decision_urls = {
+        (council, key): url for council, sources in COUNCIL_DECISIONS.items() for key, url in sources.items()
+    }
+    files = fetch_all([DEPUTIES_URL, SALARIES_URL, *decision_urls.values()])
+    archives = sync_voting_archives()
+
+    conn = connect()
+    report = {}
+    reps_df = None
+
+    def step(name, func, *args):
+        try:
+            result = func(*args)
+        except Exception as e:
+            report[name] = f"помилка: {e}"
+            return None
+        report[name] = result if isinstance(result, int) else len(result)
+        return result
+
+    if files[DEPUTIES_URL]:
+        reps_df = step("deputies", etl_deputies, conn, files[DEPUTIES_URL])
+    if files[SALARIES_URL]:
+        step("salaries", etl_salaries, conn, files[SALARIES_URL])
+
+    decision_paths = {source: files[url] for source, url in decision_urls.items() if files[url]}
+    if decision_paths:
+        step("council_decisions", etl_decisions, conn, decision_paths)
+
+    archive_paths = {quarter: archives[url] for quarter, url in VOTING_QUARTERS.items() if archives.get(url)}
+    if archive_paths and reps_df is not None:
+        step("votes", etl_votes, conn, archive_paths, reps_df)
+        step("deputy_profiles", etl_deputy_profiles, conn, archive_paths, reps_df)
+        step("voting_blocs", etl_voting_blocs, archive_paths, reps_df)
+    if archive_paths and decision_paths:
+        step("decision_links", etl_decision_links, conn, archive_paths)
+    if archive_paths:
+        step("search_index", etl_search_index, archive_paths)
+
+    step("thumbnails", etl_thumbnails)
+
+    if nazk and reps_df is not None:
+        step("nazk", etl_declarations, conn, reps_df)
+        step("declaration_stats", save_declaration_stats, reps_df)
+
+    checked_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    urls = [DEPUTIES_URL, SALARIES_URL, *decision_urls.values(), *VOTING_QUARTERS.values()]
+    write_table(conn, "sources", pd.DataFrame([
+        {"url": url, "sha256": get_meta(url).get("sha256"), "fetched_at": get_meta(url).get("fetched_at"),
+         "checked_at": checked_at}
+        for url in urls
+    ]), primary_key=("url",))
+    conn.close()
+    return report
+
+
+if __name__ == "__main__":
+    report = run(nazk="--nazk" in sys.argv)
+    for source, result in report.items():
+        ok = isinstance(result, int)
+        print(f"  {'✓' if ok else '✗'} {source}: {result if not ok else f'{result} рядків'}")
+    review = read_table("decision_links", where="NOT confident AND score > 0")
+    if review is not None and len(review):
+        print(f"Збігів з рішеннями нижче {MATCH_MIN_SCORE} для перевірки: {len(review)} (таблиця decision_links)")
@@ -0,0 +1,75 @@
+"""
+generated.py — спільне для summaries.py та answers.py: файлове сховище згенерованих моделлю текстів
+і пакетна генерація для всіх зіставлених рішень.
+
+Кожен текст — <тека>/<ключ>.json: сам текст під своїм полем ("summary", "answer") і метадані
+(модель, версія промпту, джерело, час створення). Ключ будує модуль-власник, запис атомарний.
+"""
+
+import sys
+import json
+import pandas as pd
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from utils import write_json
+
+
+def read_generated(directory: Path, key: str, field: str) -> str | None:
+    """Збережений текст за ключем або None (файлу немає чи він пошкоджений)."""
+    path = directory / f"{key}.json"
+    if not path.exists():
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)[field]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_generated(directory: Path, key: str, field: str, text: str, **meta):
+    """Текст + метадані (модель, версія промпту, джерело) з часом створення."""
+    write_json(directory / f"{key}.json", {
+        field: text,
+        **meta,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }, indent=2)
+
+
+def run_batch(items: list, cached, create, max_workers: int) -> dict:
+    """
+    Пакетна генерація з обмеженою кількістю одночасних запитів. cached(item) → bool — текст уже є;
+    create(item) → bool — згенеровано і збережено (виняток = помилка). Повертає {"created", "cached", "failed"}.
+    """
+    def run(item):
+        if cached(item):
+            return "cached"
+        try:
+            return "created" if create(item) else "failed"
+        except Exception:
+            return "failed"
+
+    stats = {"created": 0, "cached": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for status in pool.map(run, items):
+            stats[status] += 1
+    return stats
+
+
+def load_matched_decisions() -> pd.DataFrame:
+    """Зв'язки «питання → рішення» з оцінкою ≥ MATCH_MIN_SCORE по всіх архівах VOTING_QUARTERS (для запуску окремо)."""
+    # docs.py сам імпортує summaries/answers — тому імпорти тут, а не на рівні модуля
+    from downloads import sync_voting_archives
+    from votes import build_title_index
+    from docs import MATCH_MIN_SCORE, save_decision_links
+
+    frames = []
+    for path in filter(None, sync_voting_archives().values()):
+        links_df = save_decision_links(path.name, build_title_index(path.read_bytes()))
+        frames.append(links_df[links_df["score"] >= MATCH_MIN_SCORE])
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["doc_url", "title"])
+
+
+def workers_arg(default: int) -> int:
+    """--workers N з командного рядка."""
+    return int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else default
@@ -0,0 +1,157 @@
+"""
+identity.py — єдиний індекс «написання ПІБ → id депутата» для голосувань і фото.
+
+Кожне написання, що трапляється в джерелах («Андронов В.Є.», «АНДРОНОВ Владислав Євгенович»,
+«Ар’єва Я. В.»), нормалізується і зводиться до id з таблиці депутатів (колонка '№ з/п').
+Після цього всі з'єднання — цілочисельні, а нерозпізнані написання потрапляють у звіт.
+Декларанти НАЗК сюди не зводяться: пошук повертає й тезок поза радою, яких індекс складу ради
+не розрізнить, тож їх обирає nazk.resolve_declarant (спільна лише normalize_name).
+
+Запуск окремо: python identity.py — друкує звіт про нерозпізнані та суперечливі написання.
+"""
+
+import re
+import json
+import difflib
+import pandas as pd
+from collections import defaultdict
+from data import CACHE_DIR
+from utils import content_hash, write_json
+
+IDENTITY_DIR = CACHE_DIR / "identity"
+
+# Латинські літери, схожі на кириличні, що трапляються в ручному наборі
+LATIN_LOOKALIKES = str.maketrans("aceiopxykABCEHIKMOPTXY", "асеіорхукАВСЕНІКМОРТХУ")
+APOSTROPHES = "’ʼ`‘′´"
+
+# Мінімальна схожість прізвищ для нечіткого збігу (за однакових ініціалів)
+FUZZY_MIN_RATIO = 0.85
+
+
+def normalize_name(name) -> str:
+    """'Ар’єва  Я.В.' → "ар'єва я в": нижній регістр, єдиний апостроф, без крапок і зайвих пробілів."""
+    text = str(name).translate(LATIN_LOOKALIKES).lower()
+    text = re.sub(f"[{APOSTROPHES}]", "'", text)
+    return " ".join(text.replace(".", " ").split())
+
+
+def name_keys(full_name: str) -> list[str]:
+    """Усі нормалізовані форми повного ПІБ: повне, прізвище + ім'я, прізвище + ініціали."""
+    tokens = normalize_name(full_name).split()
+    if len(tokens) < 2:
+        return [" ".join(tokens)] if tokens else []
+    surname, given = tokens[0], tokens[1:]
+    keys = [
+        " ".join(tokens),
+        f"{surname} {given[0]}",
+        f"{surname} {' '.join(g[0] for g in given)}",
+        f"{surname} {given[0][0]}",
+    ]
+    return list(dict.fromkeys(keys))
+
+
+def build_identity_index(reps_lookup) -> dict:
+    """
+    Довідник депутатів (id, full_name) → індекс:
+        aliases   — {нормалізоване_написання: id}; неоднозначні форми (два депутати) не потрапляють
+        deputies  — {id: нормалізоване повне ПІБ} для нечіткого збігу
+    """
+    owners = defaultdict(set)
+    deputies = {}
+    for dep_id, full_name in zip(reps_lookup['id'], reps_lookup['full_name']):
+        if pd.isna(dep_id) or pd.isna(full_name):
+            continue
+        dep_id = int(dep_id)
+        deputies[dep_id] = normalize_name(full_name)
+        for key in name_keys(full_name):
+            owners[key].add(dep_id)
+    aliases = {key: ids.pop() for key, ids in owners.items() if len(ids) == 1}
+    return {"aliases": aliases, "deputies": deputies}
+
+
+def resolve_name(index: dict, raw_name) -> int | None:
+    """
+    Написання ПІБ → id депутата або None.
+    Спершу точний збіг нормалізованої форми, далі — нечіткий збіг прізвища серед депутатів з тими ж ініціалами
+    (одруківки, різні апострофи, дефіси).
+    """
+    norm = normalize_name(raw_name)
+    if norm in index["aliases"]:
+        return index["aliases"][norm]
+
+    tokens = norm.split()
+    if len(tokens) < 2:
+        return None
+    surname, initials = tokens[0], [t[0] for t in tokens[1:]]
+    best_id, best_ratio, tie = None, 0.0, False
+    for dep_id, full in index["deputies"].items():
+        dep_tokens = full.split()
+        if [t[0] for t in dep_tokens[1:1 + len(initials)]] != initials:
+            continue
+        ratio = difflib.SequenceMatcher(None, surname, dep_tokens[0]).ratio()
+        if ratio > best_ratio:
+            best_id, best_ratio, tie = int(dep_id), ratio, False
+        elif ratio == best_ratio:
+            tie = True
+    if best_ratio >= FUZZY_MIN_RATIO and not tie:
+        return best_id
+    return None
+
+
+def load_identity_index(reps_lookup) -> dict:
+    """Індекс для поточного складу ради; зберігається в IDENTITY_DIR за хешем складу."""
+    roster = reps_lookup[['id', 'full_name']].to_json(orient="values", force_ascii=False)
+    path = IDENTITY_DIR / f"{content_hash(roster.encode('utf-8'))[:24]}.json"
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+        index["deputies"] = {int(k): v for k, v in index["deputies"].items()}
+        return index
+    index = build_identity_index(reps_lookup)
+    write_json(path, index)
+    return index
+
+
+def build_identity_report(index: dict, sources: dict[str, dict | list]) -> dict:
+    """
+    Звіт по джерелах: {джерело: {"unresolved": [...], "conflicts": [...]}}.
+    sources — {назва: список написань} або {назва: {очікуваний_id: написання}} (напр. DEPUTY_PHOTOS),
+    для других перевіряється, що написання зводиться саме до свого id.
+    """
+    report = {}
+    for source, names in sources.items():
+        unresolved, conflicts = [], []
+        items = names.items() if isinstance(names, dict) else ((None, n) for n in names)
+        for expected_id, raw_name in items:
+            dep_id = resolve_name(index, raw_name)
+            if dep_id is None:
+                unresolved.append(raw_name)
+            elif expected_id is not None and dep_id != int(expected_id):
+                conflicts.append({"name": raw_name, "expected_id": int(expected_id), "resolved_id": dep_id})
+        report[source] = {"unresolved": sorted(set(unresolved)), "conflicts": conflicts}
+    return report
+
+
+if __name__ == "__main__":
+    from photos import DEPUTY_PHOTOS
+    from utils import load_deputies
+    from votes import VOTES_DIR, get_reps_lookup
+
+    reps_df = load_deputies()
+    reps_lookup = get_reps_lookup(reps_df)
+    index = load_identity_index(reps_lookup)
+    vote_names = []
+    for rows_path in VOTES_DIR.glob("*/rows.parquet"):
+        rows_df = pd.read_parquet(rows_path)
+        vote_names += rows_df.loc[rows_df['id'].isna(), 'full_name'].tolist()
+    report = build_identity_report(index, {
+        "Голосування": vote_names,
+        "Таблиця депутатів": dict(zip(reps_lookup['id'], reps_lookup['full_name'])),
+        "Фото": {dep_id: entry["name"] for dep_id, entry in DEPUTY_PHOTOS.items()},
+    })
+    for source, result in report.items():
+        print(f"{source}: нерозпізнано {len(result['unresolved'])}, суперечностей {len(result['conflicts'])}")
+        for name in result["unresolved"]:
+            print(f"  ? {name}")
+        for c in result["conflicts"]:
+            print(f"  ! {c['name']}: очікувано {c['expected_id']}, знайдено {c['resolved_id']}")
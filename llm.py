@@ -0,0 +1,172 @@
+"""
+llm.py — один на процес клієнт Claude API для оглядів, чату та пакетної генерації.
+
+Спільний HTTP-пул (keep-alive, без TLS-рукостискання на кожен запит), не більше LLM_MAX_CONCURRENCY
+запитів одночасно, повтори з експоненційною затримкою і jitter (вбудовані в SDK: 429, 5xx, обриви
+з'єднання; враховують retry-after). Ковзне вікно за хвилину рахує токени й вартість: якщо запит
+вийде за LLM_TOKENS_PER_MINUTE або LLM_COST_PER_MINUTE, він не надсилається — викликач отримує
+LLMBusy і показує кешовану відповідь або відповідь лише за назвою рішення.
+Кожен виклик (затримка, час до першого токена, токени, влучання в prompt cache) пишеться в metrics.py.
+"""
+
+import os
+import time
+import threading
+import httpx
+import anthropic
+import streamlit as st
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from metrics import record
+
+LLM_MAX_CONCURRENCY = 8
+LLM_QUEUE_TIMEOUT = 20  # секунд очікування вільного слота
+LLM_MAX_RETRIES = 4
+LLM_TIMEOUT = 120
+LLM_TOKENS_PER_MINUTE = 400_000
+LLM_COST_PER_MINUTE = 1.0  # USD
+
+# $ за мільйон токенів: (вхід, вихід)
+MODEL_PRICES = {"claude-haiku-4-5": (1.0, 5.0)}
+DOCUMENT_TOKENS_ESTIMATE = 30_000  # PDF-документ у запиті (до PDF_MAX_PAGES сторінок)
+
+
+class LLMBusy(Exception):
+    """Немає вільного слота або вичерпано хвилинний бюджет — запит не надіслано."""
+
+
+_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+_window = deque()  # [час, токени, вартість] — резерв до відповіді, далі фактичне споживання
+_window_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_client() -> anthropic.Anthropic:
+    """Клієнт API: ключ зі змінної середовища (офлайн-запуск) або зі st.secrets (сторінки)."""
+    return anthropic.Anthropic(
+        api_key=os.environ.get("ANTHROPIC_API_KEY") or st.secrets["ANTHROPIC_API_KEY"],
+        max_retries=LLM_MAX_RETRIES,
+        timeout=LLM_TIMEOUT,
+        http_client=anthropic.DefaultHttpxClient(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONCURRENCY, max_keepalive_connections=LLM_MAX_CONCURRENCY),
+        ),
+    )
+
+
+def estimate_tokens(request: dict) -> int:
+    """Груба оцінка токенів запиту: ~3 символи тексту на токен, PDF — DOCUMENT_TOKENS_ESTIMATE, плюс max_tokens."""
+    chars = len(request.get("system", ""))
+    documents = 0
+    for msg in request["messages"]:
+        blocks = msg["content"] if isinstance(msg["content"], list) else [{"type": "text", "text": msg["content"]}]
+        for block in blocks:
+            if block["type"] == "document":
+                documents += 1
+            else:
+                chars += len(block.get("text", ""))
+    return chars // 3 + documents * DOCUMENT_TOKENS_ESTIMATE + request["max_tokens"]
+
+
+def _cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICES.get(model, max(MODEL_PRICES.values()))
+    return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+def _spent(now: float) -> tuple[int, float]:
+    while _window and now - _window[0][0] > 60:
+        _window.popleft()
+    return sum(entry[1] for entry in _window), sum(entry[2] for entry in _window)
+
+
+def get_usage() -> dict:
+    """Споживання за останню хвилину: {"tokens", "cost"}."""
+    with _window_lock:
+        tokens, cost = _spent(time.monotonic())
+    return {"tokens": tokens, "cost": round(cost, 4)}
+
+
+def _reserve(request: dict) -> list:
+    """Резервує оцінку запиту у вікні або кидає LLMBusy, якщо бюджет хвилини буде перевищено."""
+    estimate = estimate_tokens(request)
+    cost = _cost(request["model"], estimate - request["max_tokens"], request["max_tokens"])
+    with _window_lock:
+        now = time.monotonic()
+        tokens, spent = _spent(now)
+        if tokens + estimate > LLM_TOKENS_PER_MINUTE or spent + cost > LLM_COST_PER_MINUTE:
+            raise LLMBusy(f"бюджет хвилини: {tokens} токенів, ${spent:.2f}")
+        entry = [now, estimate, cost]
+        _window.append(entry)
+    return entry
+
+
+def _settle(entry: list, model: str, usage):
+    """Замінює резерв фактичним споживанням з usage відповіді."""
+    input_tokens = (usage.input_tokens + (usage.cache_creation_input_tokens or 0)
+                    + (usage.cache_read_input_tokens or 0))
+    with _window_lock:
+        entry[1] = input_tokens + usage.output_tokens
+        entry[2] = _cost(model, usage.input_tokens + 1.25 * (usage.cache_creation_input_tokens or 0)
+                         + 0.1 * (usage.cache_read_input_tokens or 0), usage.output_tokens)
+
+
+@contextmanager
+def _slot():
+    if not _slots.acquire(timeout=LLM_QUEUE_TIMEOUT):
+        raise LLMBusy("усі слоти зайняті")
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+def create(purpose: str = "", path: str = "", **request) -> anthropic.types.Message:
+    """
+    client.messages.create у межах слота і бюджету. LLMBusy — запит не надіслано.
+    purpose / path — сценарій і шлях відповіді для журналу metrics.py.
+    """
+    started = time.perf_counter()
+    try:
+        with _slot():
+            entry = _reserve(request)
+            response = get_client().messages.create(**request)
+            _settle(entry, request["model"], response.usage)
+    except Exception as e:
+        record(purpose, path, _status(e), request["model"], (time.perf_counter() - started) * 1000)
+        raise
+    record(purpose, path, "ok", request["model"], (time.perf_counter() - started) * 1000, usage=response.usage)
+    return response
+
+
+@contextmanager
+def stream(purpose: str = "", path: str = "", **request):
+    """
+    client.messages.stream у межах слота і бюджету (слот зайнятий до кінця стріму) → генератор фрагментів
+    тексту для st.write_stream. LLMBusy — запит не надіслано. Час до першого токена — у журнал metrics.py.
+    """
+    started = time.perf_counter()
+    first_token = None
+
+    def text_stream(response_stream):
+        nonlocal first_token
+        for text in response_stream.text_stream:
+            if first_token is None:
+                first_token = time.perf_counter()
+            yield text
+
+    try:
+        with _slot():
+            entry = _reserve(request)
+            with get_client().messages.stream(**request) as response_stream:
+                yield text_stream(response_stream)
+                usage = response_stream.get_final_message().usage
+                _settle(entry, request["model"], usage)
+    except Exception as e:
+        record(purpose, path, _status(e), request["model"], (time.perf_counter() - started) * 1000)
+        raise
+    ttft = (first_token - started) * 1000 if first_token else None
+    record(purpose, path, "ok", request["model"], (time.perf_counter() - started) * 1000, ttft, usage)
+
+
+def _status(error: Exception) -> str:
+    return "busy" if isinstance(error, LLMBusy) else type(error).__name__
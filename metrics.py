@@ -0,0 +1,119 @@
+"""
+metrics.py — журнал викликів моделі: затримка, час до першого токена, токени, влучання в кеші.
+
+Кожен виклик через llm.py (а також відповіді з кешів answers.py / summaries.py) — рядок JSON у
+CACHE_DIR/metrics/llm-<дата>.jsonl; файл на кожен день, старші за METRICS_KEEP_DAYS видаляються.
+summarize_metrics дає p50/p95 і частку влучань у prompt cache для кожного сценарію (purpose) і шляху (path).
+
+Запуск окремо: python metrics.py [--days N] — зведена таблиця за останні N днів.
+"""
+
+import sys
+import json
+import threading
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from data import CACHE_DIR
+
+METRICS_DIR = CACHE_DIR / "metrics"
+METRICS_KEEP_DAYS = 30
+
+METRIC_FIELDS = [
+    "ts", "purpose", "path", "model", "status", "latency_ms", "ttft_ms",
+    "input_tokens", "output_tokens", "cache_read_tokens", "cache_creation_tokens",
+]
+
+_write_lock = threading.Lock()
+
+
+def _metrics_path(day: datetime):
+    return METRICS_DIR / f"llm-{day:%Y-%m-%d}.jsonl"
+
+
+def _rotate(today: datetime):
+    """Видаляє журнали, старші за METRICS_KEEP_DAYS."""
+    oldest = _metrics_path(today - timedelta(days=METRICS_KEEP_DAYS)).name
+    for path in METRICS_DIR.glob("llm-*.jsonl"):
+        if path.name < oldest:
+            path.unlink(missing_ok=True)
+
+
+def record(purpose: str, path: str, status: str = "ok", model: str = "", latency_ms: float = 0,
+           ttft_ms: float | None = None, usage=None):
+    """
+    Дописує подію в журнал дня. path — шлях відповіді: "text", "pdf", "title" (огляд), "live", "answer_cache",
+    "store", "busy" тощо. usage — anthropic usage (токени) або None для відповідей без запиту до API.
+    """
+    now = datetime.now(timezone.utc)
+    event = {
+        "ts": now.isoformat(timespec="milliseconds"),
+        "purpose": purpose,
+        "path": path,
+        "model": model,
+        "status": status,
+        "latency_ms": round(latency_ms, 1),
+        "ttft_ms": None if ttft_ms is None else round(ttft_ms, 1),
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_read_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        "cache_creation_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+    }
+    try:
+        with _write_lock:
+            METRICS_DIR.mkdir(parents=True, exist_ok=True)
+            target = _metrics_path(now)
+            if not target.exists():
+                _rotate(now)
+            with open(target, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    except OSError:
+        pass  # метрики не мають ламати відповідь користувачу
+
+
+def load_metrics(days: int = 7) -> pd.DataFrame:
+    """Події за останні days днів (усі файли журналу, що потрапляють у період)."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = []
+    for path in sorted(METRICS_DIR.glob("llm-*.jsonl")):
+        if path.name < _metrics_path(since).name:
+            continue
+        with open(path, encoding="utf-8") as f:
+            rows += [json.loads(line) for line in f if line.strip()]
+    return pd.DataFrame(rows, columns=METRIC_FIELDS)
+
+
+def summarize_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Зведення по (purpose, path): кількість, помилки, p50/p95 затримки й TTFT, середні токени,
+    частка викликів з влучанням у prompt cache і частка закешованих вхідних токенів.
+    """
+    if df.empty:
+        return pd.DataFrame()
+    df = df.copy()
+    df["ttft_ms"] = pd.to_numeric(df["ttft_ms"], errors="coerce")
+    df["cache_hit"] = df["cache_read_tokens"] > 0
+    df["prompt_tokens"] = df["input_tokens"] + df["cache_read_tokens"] + df["cache_creation_tokens"]
+    summary = df.groupby(["purpose", "path"]).agg(
+        calls=("status", "size"),
+        errors=("status", lambda s: int((s != "ok").sum())),
+        latency_p50=("latency_ms", "median"),
+        latency_p95=("latency_ms", lambda s: s.quantile(0.95)),
+        ttft_p50=("ttft_ms", "median"),
+        ttft_p95=("ttft_ms", lambda s: s.quantile(0.95)),
+        input_tokens=("input_tokens", "mean"),
+        output_tokens=("output_tokens", "mean"),
+        cache_hit_rate=("cache_hit", "mean"),
+        cache_read_tokens=("cache_read_tokens", "sum"),
+        prompt_tokens=("prompt_tokens", "sum"),
+    )
+    summary["cached_token_share"] = (summary["cache_read_tokens"] / summary["prompt_tokens"].where(summary["prompt_tokens"] > 0)).fillna(0)
+    return summary.drop(columns=["cache_read_tokens", "prompt_tokens"]).round(2)
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[sys.argv.index("--days") + 1]) if "--days" in sys.argv else 7
+    df = load_metrics(days)
+    print(f"Подій за {days} дн.: {len(df)} ({METRICS_DIR})")
+    if len(df):
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(summarize_metrics(df).to_string())
@@ -1,24 +1,111 @@
-from fastapi import FastAPI, Query
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
 import httpx
 
-app = FastAPI()
 BASE = "https://public-api.nazk.gov.ua/v2"
 HEADERS = {"User-Agent": "Shanovni/1.0"}
 
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # VM має 1 ГБ; декларації — від кількох КБ до кількох МБ
+SEARCH_TTL = 3600  # секунд; подані декларації незмінні — /documents/{doc_id} кешуються без TTL
+
+
+class ResponseCache:
+    """LRU відповідей (сирі байти JSON) з лімітом на сумарний розмір і TTL на запис; ttl=None — без строку."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()  # ключ → (термін дії або None, тіло)
+
+    def get(self, key: str) -> bytes | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, body = entry
+        if expires is not None and expires < time.monotonic():
+            self._drop(key)
+            return None
+        self.entries.move_to_end(key)
+        return body
+
+    def set(self, key: str, body: bytes, ttl: float | None):
+        if len(body) > self.max_bytes:
+            return
+        if key in self.entries:
+            self._drop(key)
+        self.entries[key] = (None if ttl is None else time.monotonic() + ttl, body)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            self._drop(next(iter(self.entries)))
+
+    def _drop(self, key: str):
+        _, body = self.entries.pop(key)
+        self.size -= len(body)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Один пул з'єднань (HTTP/2, keep-alive) на весь час роботи — без TLS-рукостискання на кожен запит
+    async with httpx.AsyncClient(
+        base_url=BASE,
+        headers=HEADERS,
+        http2=True,
+        timeout=15,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+    ) as client:
+        app.state.client = client
+        app.state.cache = ResponseCache(CACHE_MAX_BYTES)
+        app.state.inflight = {}
+        yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+async def _upstream(path: str, params: dict, ttl: float | None) -> tuple[int, bytes]:
+    try:
+        r = await app.state.client.get(path, params=params)
+    except httpx.HTTPError as e:
+        return 502, str(e).encode("utf-8")
+    if r.status_code == 200:
+        app.state.cache.set(_cache_key(path, params), r.content, ttl)
+    return r.status_code, r.content
+
+
+def _cache_key(path: str, params: dict) -> str:
+    return path + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+
+async def proxy(path: str, params: dict, ttl: float | None):
+    key = _cache_key(path, params)
+    body = app.state.cache.get(key)
+    if body is not None:
+        return Response(body, media_type="application/json")
+
+    # Однакові одночасні запити чекають на один запит до НАЗК
+    task = app.state.inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_upstream(path, params, ttl))
+        app.state.inflight[key] = task
+        task.add_done_callback(lambda _: app.state.inflight.pop(key, None))
+    status, body = await asyncio.shield(task)
+    if status != 200:
+        return {"error": status, "body": body.decode("utf-8", "replace")[:500]}
+    return Response(body, media_type="application/json")
+
 
 @app.get("/documents/list")
-async def search(query: str = Query(...)):
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        r = await client.get(f"{BASE}/documents/list", params={"query": query}, headers=HEADERS, timeout=15)
-        if r.status_code != 200:
-            return {"error": r.status_code, "body": r.text[:500]}
-        return r.json()
+async def search(query: str | None = None, user_declarant_id: str | None = None):
+    params = {k: v for k, v in (("query", query), ("user_declarant_id", user_declarant_id)) if v}
+    if not params:
+        raise HTTPException(422, "query або user_declarant_id обов'язковий")
+    return await proxy("/documents/list", params, SEARCH_TTL)
 
 
 @app.get("/documents/{doc_id}")
 async def document(doc_id: str):
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        r = await client.get(f"{BASE}/documents/{doc_id}", headers=HEADERS, timeout=15)
-        if r.status_code != 200:
-            return {"error": r.status_code, "body": r.text[:500]}
-        return r.json()
+    return await proxy(f"/documents/{doc_id}", {}, None)
@@ -1,101 +1,322 @@
 """
 nazk.py — інтеграція з Public API НАЗК (public-api.nazk.gov.ua/v2).
-Кешується на 24 год. Використання: from nazk import show_declaration
+Декларації (незмінні) зберігаються в сховищі store.py за uuid і з API більше не качаються;
+оновлюється лише пошук — раз на SEARCH_MAX_AGE (нові та виправлені подання).
+Пошук за прізвищем та ім'ям знаходить і тезок: resolve_declarant обирає декларанта за по батькові,
+місцем роботи та історією подач, а вибір зберігається за id депутата (nazk_declarants).
+Використання: from nazk import show_declaration
 """
 
 import requests
 import streamlit as st
+from dataclasses import dataclass, field, asdict
+from datetime import timedelta
 from urllib.parse import quote_plus
 from data import UA, NAZK_API, NAZK_PUBLIC
 from utils import get_badge
+from store import read_document, save_document, has_document
+from identity import normalize_name
+
+SEARCH_MAX_AGE = timedelta(days=1)
+COUNCIL_WORKPLACE = "київська міська рада"
+
+
+@dataclass(slots=True)
+class DeclarationMeta:
+    year: int | None
+    type: str
+    doc_type: str
+    submitted: str
+    position: str = ""
+
+
+@dataclass(slots=True)
+class Realty:
+    type: str
+    area: float
+    country: str
+    ownership: str
+
+
+@dataclass(slots=True)
+class Land:
+    area: float
+    purpose: str
+    country: str
+    ownership: str
+
+
+@dataclass(slots=True)
+class Vehicle:
+    type: str
+    brand: str
+    year: str
+    country: str
+
+
+@dataclass(slots=True)
+class Security:
+    type: str
+    emitent: str
+    amount: float
+    cost: float
+
+
+@dataclass(slots=True)
+class CorporateRight:
+    name: str
+    code: str
+    share: float  # частка, %
+    cost: float
+
+
+@dataclass(slots=True)
+class Income:
+    source: str
+    amount: float
+    currency: str
+
+
+@dataclass(slots=True)
+class Cash:
+    bank: str
+    amount: float
+    currency: str
+
+
+@dataclass(slots=True)
+class Liability:
+    type: str
+    amount: float
+    currency: str
+
+
+@dataclass(slots=True)
+class Declaration:
+    """Розібрана декларація (parse_declaration). Списки — розділи, *_totals — {валюта: сума}."""
+    meta: DeclarationMeta
+    realty: list[Realty] = field(default_factory=list)
+    land: list[Land] = field(default_factory=list)
+    vehicles: list[Vehicle] = field(default_factory=list)
+    securities: list[Security] = field(default_factory=list)
+    corporate_rights: list[CorporateRight] = field(default_factory=list)
+    incomes: list[Income] = field(default_factory=list)
+    cash: list[Cash] = field(default_factory=list)
+    liabilities: list[Liability] = field(default_factory=list)
+    total_income: float = 0.0
+    cash_totals: dict[str, float] = field(default_factory=dict)
+    liability_totals: dict[str, float] = field(default_factory=dict)
+
+
+def fetch_search(query: str = "", user_declarant_id: str = "") -> dict | None:
+    """Сира відповідь /documents/list (за ПІБ або id декларанта) або None — дозавантаження для сторінки (etl.py качає через prefetch.py)."""
+    params = {"user_declarant_id": user_declarant_id} if user_declarant_id else {"query": query}
+    r = requests.get(
+        f"{NAZK_API}/documents/list",
+        params=params,
+        headers=UA,
+        timeout=15,
+    )
+    return r.json() if r.status_code == 200 else None
 
 
-@st.cache_data(ttl=86400, show_spinner=False)
-def search_declarations(query: str) -> list[dict]:
-    """Пошук декларацій за ПІБ."""
-    try:
-        r = requests.get(
-            f"{NAZK_API}/documents/list",
-            params={"query": query},
-            headers=UA,
-            timeout=15,
-        )
-        if r.status_code != 200:
-            return []
+def fetch_document(doc_id: str) -> dict | None:
+    """Сира відповідь /documents/{uuid} або None — дозавантаження для сторінки (etl.py качає через prefetch.py)."""
+    r = requests.get(
+        f"{NAZK_API}/documents/{doc_id}",
+        headers=UA,
+        timeout=15,
+    )
+    return r.json() if r.status_code == 200 else None
 
-        data = r.json()
-        results = []
 
-        for doc in data.get("data", []):
-            decl_type = doc.get("declaration_type")
-            if not decl_type or decl_type == 0:
-                continue
+def declarant_key(doc: dict) -> str:
+    """Хто подав документ: user_declarant_id з API, інакше нормалізований ПІБ зі step_1."""
+    return str(doc.get("user_declarant_id") or "") or normalize_name(_declarant_name(doc))
 
-            results.append({
-                "id": doc.get("id", ""),
-                "year": doc.get("declaration_year"),
-                "type": _declaration_type_label(decl_type),
-                "doc_type": _doc_type_label(doc.get("document_type")),
-                "date": doc.get("date", "")[:10] if doc.get("date") else "",
-                "url": f"{NAZK_PUBLIC}/{doc.get('id', '')}",
-            })
 
-        # Сортуємо: найновіша декларація першою
-        results.sort(key=lambda x: x.get("year") or 0, reverse=True)
-        return results
+def current_filings(data: dict) -> list[dict]:
+    """
+    Декларації з відповіді пошуку (без повідомлень про зміни), найновіші першими. Виправлена
+    декларація (document_type 3) замінює попередню подачу того ж декларанта, року і типу.
+    """
+    latest = {}
+    for doc in data.get("data", []):
+        if not doc.get("declaration_type") or not doc.get("id"):
+            continue
+        key = (declarant_key(doc), doc.get("declaration_year"), doc.get("declaration_type"))
+        known = latest.get(key)
+        if known is None or (doc.get("date") or "") > (known.get("date") or ""):
+            latest[key] = doc
+    return sorted(latest.values(), key=lambda d: d.get("declaration_year") or 0, reverse=True)
+
+
+def parse_search(data: dict) -> list[dict]:
+    """Сира відповідь пошуку → список декларацій для сторінки і resolve_declarant."""
+    results = []
+    for doc in current_filings(data):
+        step1 = _step_items((doc.get("data", {}) or {}).get("step_1"))
+        s1 = step1[0] if step1 else {}
+        results.append({
+            "id": doc.get("id", ""),
+            "year": doc.get("declaration_year"),
+            "type": _declaration_type_label(doc.get("declaration_type")),
+            "doc_type": _doc_type_label(doc.get("document_type")),
+            "date": doc.get("date", "")[:10] if doc.get("date") else "",
+            "url": f"{NAZK_PUBLIC}/{doc.get('id', '')}",
+            "declarant": _declarant_name(doc),
+            "declarant_key": declarant_key(doc),
+            "user_declarant_id": str(doc.get("user_declarant_id") or ""),
+            "work": f"{s1.get('workPost', '') or ''} {s1.get('workPlace', '') or ''}".strip(),
+        })
+    return results
 
-    except Exception:
-        return []
+
+def search_key(query: str, user_declarant_id: str = "") -> str:
+    """Ключ відповіді пошуку в nazk_searches — спільний для сторінок і prefetch.py."""
+    return f"user_declarant_id:{user_declarant_id}" if user_declarant_id else query
 
 
 @st.cache_data(ttl=86400, show_spinner=False)
-def load_declaration(doc_id: str) -> dict:
-    """Завантажує повну декларацію за uuid, повертає структурований dict."""
+def _search_declarations(query: str, user_declarant_id: str) -> list[dict]:
+    """Сховище, якщо пошук не старший за SEARCH_MAX_AGE, інакше API (зберігається). Збій API — виняток, тож у кеш потрапляють лише свіжі відповіді."""
+    key = search_key(query, user_declarant_id)
+    data = read_document("nazk_searches", key, max_age=SEARCH_MAX_AGE)
+    if not data:
+        data = fetch_search(query, user_declarant_id)
+        if not data:
+            raise LookupError(f"пошук НАЗК {key} недоступний")
+        save_document("nazk_searches", key, data)
+    return parse_search(data)
+
+
+def search_declarations(query: str, user_declarant_id: str = "") -> list[dict]:
+    """
+    Пошук декларацій за ПІБ (або за id декларанта). API недоступне (помилка, тайм-аут, не 200) — остання
+    збережена відповідь будь-якого віку, без кешу в пам'яті: наступний виклик спробує API знову.
+    Результат — усі знайдені декларанти; вибір депутата — get_declaration_list.
+    """
     try:
-        r = requests.get(
-            f"{NAZK_API}/documents/{doc_id}",
-            headers=UA,
-            timeout=15,
-        )
-        if r.status_code != 200:
-            return {}
-
-        raw = r.json()
-        data = raw.get("data", {})
-
-        return {
-            "meta": _parse_meta(raw, data),
-            "realty": _parse_realty(data),
-            "land": _parse_land(data),
-            "vehicles": _parse_vehicles(data),
-            "incomes": _parse_incomes(data),
-            "cash": _parse_cash(data),
-            "liabilities": _parse_liabilities(data),
-            "total_income": _calc_total_income(data),
-        }
-
+        return _search_declarations(query, user_declarant_id)
     except Exception:
-        return {}
+        stale = read_document("nazk_searches", search_key(query, user_declarant_id))
+        return parse_search(stale) if stale else []
+
+
+@st.cache_data(max_entries=1000, show_spinner=False)
+def _load_declaration(doc_id: str) -> Declaration:
+    """Сховище, інакше API (зберігається). Збій — виняток, тож у кеш без TTL потрапляють лише розібрані декларації."""
+    raw = read_document("nazk_documents", doc_id)
+    if not raw:
+        raw = fetch_document(doc_id)
+        if not raw:
+            raise LookupError(f"декларація {doc_id} недоступна")
+        save_document("nazk_documents", doc_id, raw)
+    return parse_declaration(raw)
+
+
+def load_declaration(doc_id: str) -> Declaration | None:
+    """
+    Повна декларація за uuid (parse_declaration) або None. Подана декларація не змінюється:
+    з API вона качається лише раз і зберігається в сховищі (nazk_documents), кеш у пам'яті — без TTL.
+    None (збій API) не кешується — наступний виклик спробує знову.
+    """
+    try:
+        return _load_declaration(doc_id)
+    except Exception:
+        return None
 
 
-def get_deputy_declarations(full_name: str) -> tuple[list[dict], dict]:
-    """Повертає (список_декларацій, остання_розпарсена_декларація)."""
+def declaration_query(full_name: str) -> str:
+    """'Прізвище Ім'я По батькові' → запит до пошуку НАЗК (прізвище + ім'я)."""
     parts = full_name.split() if full_name else []
-    query = f"{parts[0]} {parts[1]}" if len(parts) >= 2 else full_name
+    return f"{parts[0]} {parts[1]}" if len(parts) >= 2 else (full_name or "")
+
+
+def resolve_declarant(full_name: str, declarations: list[dict]) -> dict | None:
+    """
+    Хто з декларантів у результатах пошуку — цей депутат. Прізвище й ім'я мають збігтися, по батькові
+    (якщо відоме з обох боків) теж; далі бали за по батькові, місце роботи COUNCIL_WORKPLACE
+    і довжину історії подач. → {"key", "user_declarant_id", "declarant", "score"} або None.
+    """
+    target = normalize_name(full_name).split()
+    groups = {}
+    for d in declarations:
+        groups.setdefault(d["declarant_key"], []).append(d)
+
+    best, best_score = None, 0.0
+    for key, docs in groups.items():
+        names = normalize_name(docs[0]["declarant"]).split()
+        score = 0.5  # ПІБ у відповіді пошуку немає — лише місце роботи та історія
+        if names:
+            if names[:2] != target[:2]:
+                continue
+            score = 1.0
+            if len(names) > 2 and len(target) > 2:
+                if names[2] != target[2]:
+                    continue
+                score += 3.0
+        at_council = sum(COUNCIL_WORKPLACE in normalize_name(d["work"]) for d in docs)
+        score += (1.0 + 2.0 * at_council / len(docs)) if at_council else 0.0
+        score += 0.2 * min(len(docs), 5)
+        if score > best_score:
+            best, best_score = (key, docs[0]), score
+
+    if best is None:
+        return None
+    key, doc = best
+    return {"key": key, "user_declarant_id": doc["user_declarant_id"], "declarant": doc["declarant"],
+            "score": round(best_score, 2)}
+
+
+def load_declarant(full_name: str, deputy_id=None) -> dict | None:
+    """
+    Визначений декларант депутата: збережений у сховищі (nazk_declarants, ключ — id депутата)
+    або знайдений resolve_declarant за пошуком (і збережений).
+    """
+    if deputy_id is not None:
+        stored = read_document("nazk_declarants", str(deputy_id))
+        if stored and stored.get("full_name") == full_name:
+            return stored
+    query = declaration_query(full_name)
     if not query.strip():
-        return [], {}
+        return None
+    identity = resolve_declarant(full_name, search_declarations(query))
+    if identity and deputy_id is not None:
+        identity = {**identity, "full_name": full_name}
+        save_document("nazk_declarants", str(deputy_id), identity)
+    return identity
+
+
+def get_declaration_list(full_name: str, deputy_id=None) -> list[dict]:
+    """Декларації саме цього депутата (search_declarations, відфільтровані за load_declarant), найновіші першими."""
+    identity = load_declarant(full_name, deputy_id)
+    if identity is None:
+        return []
+    # Пошук за id декларанта — лише якщо він уже є у сховищі (prefetch.py); інакше збережений пошук за ПІБ,
+    # відфільтрований за декларантом, — без окремого запиту до API на кожну картку
+    declarations = []
+    user_declarant_id = identity["user_declarant_id"]
+    if user_declarant_id and has_document("nazk_searches", search_key("", user_declarant_id)):
+        declarations = search_declarations("", user_declarant_id)
+    if not declarations:
+        declarations = search_declarations(declaration_query(full_name))
+    return [d for d in declarations if d["declarant_key"] == identity["key"]]
 
-    declarations = search_declarations(query)
+
+def get_deputy_declarations(full_name: str, deputy_id=None) -> tuple[list[dict], Declaration | None]:
+    """Повертає (список_декларацій, остання_розпарсена_декларація)."""
+    declarations = get_declaration_list(full_name, deputy_id)
     if not declarations:
-        return [], {}
+        return [], None
 
     latest_id = declarations[0]["id"]
-    latest_parsed = load_declaration(latest_id) if latest_id else {}
+    latest_parsed = load_declaration(latest_id) if latest_id else None
 
     return declarations, latest_parsed
 
 
-def build_llm_context(deputy_row, declarations: list[dict], parsed: dict) -> dict:
+def build_llm_context(deputy_row, declarations: list[dict], parsed: Declaration) -> dict:
     """Збирає контекст депутата для LLM-сайдбару (session_state)."""
     return {
         "name": getattr(deputy_row, "name", ""),
@@ -106,12 +327,12 @@ def build_llm_context(deputy_row, declarations: list[dict], parsed: dict) -> dic
         "declarations_count": len(declarations),
         "declaration_years": [d["year"] for d in declarations],
         "declaration_urls": {d["year"]: d["url"] for d in declarations},
-        "declaration": parsed,   # повний структурований dict останньої декларації
+        "declaration": asdict(parsed),   # повний структурований dict останньої декларації
     }
 
 
-def show_declaration(full_name: str, deputy_row=None):
-    """Секція «Декларація» з lazy-завантаженням з НАЗК."""
+def show_declaration(full_name: str, deputy_row=None) -> str | None:
+    """Секція «Декларація» з lazy-завантаженням з НАЗК. Повертає uuid показаної декларації (або None)."""
     state_key = f"decl_loaded_{full_name}"
 
     # Lazy: кнопка для першого завантаження
@@ -123,7 +344,7 @@ def show_declaration(full_name: str, deputy_row=None):
 
     # Дані завантажуються тільки після кліку (кешуються на 24 год)
     with st.spinner("Шукаємо декларації..."):
-        declarations, parsed = get_deputy_declarations(full_name)
+        declarations, parsed = get_deputy_declarations(full_name, getattr(deputy_row, "id", None))
 
     # Оновлюємо LLM-контекст якщо є рядок депутата
     if deputy_row is not None and parsed:
@@ -153,12 +374,17 @@ def show_declaration(full_name: str, deputy_row=None):
     else:
         selected_decl = declarations[0]
 
+    if parsed is None:
+        st.caption("Не вдалось завантажити декларацію.")
+        st.link_button("Повна декларація ↗", selected_decl["url"], use_container_width=True)
+        return None
+
     # Мета
-    meta = parsed.get("meta", {})
-    decl_type = meta.get("type", "")
-    decl_year = meta.get("year", "")
-    submitted = meta.get("submitted", "")
-    position = meta.get("position", "")
+    meta = parsed.meta
+    decl_type = meta.type
+    decl_year = meta.year or ""
+    submitted = meta.submitted
+    position = meta.position
 
     tags = [decl_type, str(decl_year)] if decl_type else [str(decl_year)]
     if submitted:
@@ -168,35 +394,40 @@ def show_declaration(full_name: str, deputy_row=None):
         st.write(f"**Посада:** {position}")
 
     # Загальний дохід
-    total = parsed.get("total_income", 0)
+    total = parsed.total_income
     if total:
         st.metric("Дохід (декларант)", f"{total:,.0f} грн")
 
     # Нерухомість
-    realty = parsed.get("realty", [])
+    realty = parsed.realty
     if realty:
         st.write(f"**Нерухомість:** {len(realty)} об.")
         for obj in realty[:3]:
-            area = obj.get("area", "")
-            area_str = f", {area} м²" if area else ""
-            st.write(f"· {obj.get('type', '—')}{area_str}")
+            area_str = f", {obj.area:g} м²" if obj.area else ""
+            st.write(f"· {obj.type or '—'}{area_str}")
         if len(realty) > 3:
             st.write(f"... та ще {len(realty) - 3}")
 
     # Транспорт
-    vehicles = parsed.get("vehicles", [])
+    vehicles = parsed.vehicles
     if vehicles:
         st.write(f"**Транспорт:** {len(vehicles)} од.")
         for v in vehicles[:4]:
-            st.write(f"· {v.get('brand', '—')} {v.get('year', '')}")
+            st.write(f"· {v.brand or '—'} {v.year}")
         if len(vehicles) > 4:
             st.write(f"... та ще {len(vehicles) - 4}")
 
+    # Цінні папери та корпоративні права
+    if parsed.securities or parsed.corporate_rights:
+        st.write(f"**Цінні папери:** {len(parsed.securities)}, **корпоративні права:** {len(parsed.corporate_rights)}")
+        for right in parsed.corporate_rights[:3]:
+            share_str = f", {right.share:g}%" if right.share else ""
+            st.write(f"· {right.name or '—'}{share_str}")
+
     # Грошові активи
-    cash = parsed.get("cash", [])
-    if cash:
-        total_uah = sum(c["amount"] for c in cash if c.get("currency") == "UAH")
-        total_usd = sum(c["amount"] for c in cash if c.get("currency") == "USD")
+    if parsed.cash:
+        total_uah = parsed.cash_totals.get("UAH", 0)
+        total_usd = parsed.cash_totals.get("USD", 0)
         parts = []
         if total_uah:
             parts.append(f"{total_uah:,.0f} грн")
@@ -210,111 +441,129 @@ def show_declaration(full_name: str, deputy_row=None):
         selected_decl["url"],
         use_container_width=True,
     )
+    return selected_decl["id"]
 
 
-def _get_step(data: dict, step_num: int) -> list:
-    step = data.get(f"step_{step_num}", {})
-    if isinstance(step, dict):
-        result = step.get("data", []) or []
-        if isinstance(result, dict):
-            return [result]
-        return result
-    return []
+def _declarant_name(doc: dict) -> str:
+    """ПІБ декларанта з розділу step_1 документа (для resolve_declarant)."""
+    step1 = _step_items((doc.get("data", {}) or {}).get("step_1"))
+    s1 = step1[0] if step1 else {}
+    parts = [s1.get("lastname", ""), s1.get("firstname", ""), s1.get("middlename", "")]
+    return " ".join(p.strip() for p in parts if isinstance(p, str) and p.strip())
 
 
-def _parse_meta(raw: dict, data: dict) -> dict:
-    position = ""
-    step1 = _get_step(data, 1)
-    if step1:
-        s1 = step1[0] if isinstance(step1, list) and step1 else {}
-        position = s1.get("workPost", "") or s1.get("postType", "")
+def _uk_name(value) -> str:
+    return value.get("ukName", "") if isinstance(value, dict) else ""
 
-    return {
-        "year": raw.get("declaration_year"),
-        "type": _declaration_type_label(raw.get("declaration_type")),
-        "doc_type": _doc_type_label(raw.get("document_type")),
-        "submitted": (raw.get("date", "") or "")[:10],
-        "position": position,
-    }
 
+def _currency(value) -> str:
+    if isinstance(value, dict):
+        return value.get("code", "UAH")
+    return value or "UAH"
 
-def _parse_realty(data: dict) -> list:
-    result = []
-    for obj in _get_step(data, 3):
-        result.append({
-            "type": obj.get("objectType", ""),
-            "area": obj.get("totalArea", ""),
-            "country": obj.get("country", {}).get("ukName", "") if isinstance(obj.get("country"), dict) else "",
-            "ownership": obj.get("ownershipType", ""),
-        })
-    return result
 
+def _number(value) -> float:
+    """Сума/площа з API (рядок, число або «[Конфіденційна інформація]») → float, нечислове → 0."""
+    try:
+        return float(str(value).replace(",", ".").replace(" ", "")) if value not in (None, "") else 0.0
+    except ValueError:
+        return 0.0
 
-def _parse_land(data: dict) -> list:
-    result = []
-    for obj in _get_step(data, 4):
-        result.append({
-            "area": obj.get("totalArea", ""),
-            "purpose": obj.get("intendedPurpose", ""),
-            "country": obj.get("country", {}).get("ukName", "") if isinstance(obj.get("country"), dict) else "",
-            "ownership": obj.get("ownershipType", ""),
-        })
-    return result
 
+def _step_items(step) -> list:
+    if not isinstance(step, dict):
+        return []
+    items = step.get("data", []) or []
+    return [items] if isinstance(items, dict) else items
 
-def _parse_vehicles(data: dict) -> list:
-    result = []
-    for obj in _get_step(data, 6):
-        result.append({
-            "type": obj.get("objectType", ""),
-            "brand": f"{obj.get('brand', '')} {obj.get('model', '')}".strip(),
-            "year": obj.get("year", ""),
-            "country": obj.get("country", {}).get("ukName", "") if isinstance(obj.get("country"), dict) else "",
-        })
-    return result
 
+def _add_declarant(decl: Declaration, obj: dict):
+    if not decl.meta.position:
+        decl.meta.position = obj.get("workPost", "") or obj.get("postType", "")
 
-def _parse_incomes(data: dict) -> list:
-    result = []
-    for obj in _get_step(data, 11):
-        if str(obj.get("person", "")) != "1":
-            continue
-        result.append({
-            "source": obj.get("objectType", "") or obj.get("source", ""),
-            "amount": float(obj.get("sizeIncome", 0) or 0),
-            "currency": obj.get("currency", "UAH"),
-        })
-    return result
 
+def _add_realty(decl: Declaration, obj: dict):
+    decl.realty.append(Realty(obj.get("objectType", ""), _number(obj.get("totalArea")),
+                              _uk_name(obj.get("country")), obj.get("ownershipType", "")))
 
-def _parse_cash(data: dict) -> list:
-    result = []
-    for obj in _get_step(data, 12):
-        result.append({
-            "bank": obj.get("organization", {}).get("ukName", "") if isinstance(obj.get("organization"), dict) else "",
-            "amount": float(obj.get("sizeAssets", 0) or 0),
-            "currency": obj.get("currency", {}).get("code", "UAH") if isinstance(obj.get("currency"), dict) else "UAH",
-        })
-    return result
 
+def _add_land(decl: Declaration, obj: dict):
+    decl.land.append(Land(_number(obj.get("totalArea")), obj.get("intendedPurpose", ""),
+                          _uk_name(obj.get("country")), obj.get("ownershipType", "")))
 
-def _parse_liabilities(data: dict) -> list:
-    result = []
-    for obj in _get_step(data, 13):
-        result.append({
-            "type": obj.get("objectType", ""),
-            "amount": float(obj.get("sizeAssets", 0) or 0),
-            "currency": obj.get("currency", {}).get("code", "UAH") if isinstance(obj.get("currency"), dict) else "UAH",
-        })
-    return result
 
+def _add_vehicle(decl: Declaration, obj: dict):
+    decl.vehicles.append(Vehicle(obj.get("objectType", ""), f"{obj.get('brand', '')} {obj.get('model', '')}".strip(),
+                                 obj.get("year", ""), _uk_name(obj.get("country"))))
 
-def _calc_total_income(data: dict) -> float:
-    return sum(
-        float(obj.get("sizeIncome", 0) or 0)
-        for obj in _get_step(data, 11)
-        if str(obj.get("person", "")) == "1"
-    )
+
+def _add_security(decl: Declaration, obj: dict):
+    emitent = obj.get("emitent_ua_company_name") or obj.get("emitent_eng_company_name") or obj.get("emitent_ua_fullname", "")
+    decl.securities.append(Security(obj.get("typeProperty", ""), emitent, _number(obj.get("amount")), _number(obj.get("cost"))))
+
+
+def _add_corporate_right(decl: Declaration, obj: dict):
+    decl.corporate_rights.append(CorporateRight(obj.get("name", "") or obj.get("en_name", ""),
+                                                obj.get("corporate_rights_company_code", ""),
+                                                _number(obj.get("cost_percent")), _number(obj.get("cost"))))
+
+
+def _add_income(decl: Declaration, obj: dict):
+    if str(obj.get("person", "")) != "1":
+        return
+    amount = _number(obj.get("sizeIncome"))
+    decl.incomes.append(Income(obj.get("objectType", "") or obj.get("source", ""), amount, _currency(obj.get("currency"))))
+    decl.total_income += amount
+
+
+def _add_cash(decl: Declaration, obj: dict):
+    cash = Cash(_uk_name(obj.get("organization")), _number(obj.get("sizeAssets")), _currency(obj.get("currency")))
+    decl.cash.append(cash)
+    decl.cash_totals[cash.currency] = decl.cash_totals.get(cash.currency, 0.0) + cash.amount
+
+
+def _add_liability(decl: Declaration, obj: dict):
+    liability = Liability(obj.get("objectType", ""), _number(obj.get("sizeAssets")), _currency(obj.get("currency")))
+    decl.liabilities.append(liability)
+    decl.liability_totals[liability.currency] = decl.liability_totals.get(liability.currency, 0.0) + liability.amount
+
+
+# step_N → обробник одного запису розділу
+STEP_PARSERS = {
+    "step_1": _add_declarant,
+    "step_3": _add_realty,
+    "step_4": _add_land,
+    "step_6": _add_vehicle,
+    "step_7": _add_security,
+    "step_8": _add_corporate_right,
+    "step_11": _add_income,
+    "step_12": _add_cash,
+    "step_13": _add_liability,
+}
+
+
+def parse_declaration(raw: dict) -> Declaration:
+    """
+    Сира відповідь /documents/{uuid} → Declaration за один прохід по розділах: кожен запис одразу
+    потрапляє у свій список, підсумки (дохід, гроші й зобов'язання за валютами) рахуються по ходу.
+    Розібрані розділи видаляються з raw["data"], щоб великий документ не тримався в пам'яті цілим.
+    """
+    decl = Declaration(DeclarationMeta(
+        year=raw.get("declaration_year"),
+        type=_declaration_type_label(raw.get("declaration_type")),
+        doc_type=_doc_type_label(raw.get("document_type")),
+        submitted=(raw.get("date", "") or "")[:10],
+    ))
+    data = raw.get("data") or {}
+    for step_name in list(data):
+        add = STEP_PARSERS.get(step_name)
+        step = data.pop(step_name)
+        if add is None:
+            continue
+        for obj in _step_items(step):
+            if isinstance(obj, dict):
+                add(decl, obj)
+    return decl
 
 
 def _declaration_type_label(val) -> str:
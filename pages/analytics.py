@@ -0,0 +1,96 @@
+import streamlit as st
+import plotly.express as px
+from utils import load_deputies, render_data_footer
+from data import DEPUTIES_URL, VOTING_QUARTERS
+from analytics import read_voting_blocs
+
+reps_df = load_deputies()
+
+if reps_df.empty:
+    st.error("Не вдалося завантажити дані з data.gov.ua — портал може бути тимчасово недоступний. Спробуйте пізніше.")
+    st.stop()
+
+st.title("Аналітика голосувань")
+st.subheader("Наскільки згуртовано голосують фракції та хто з депутатів голосує однаково — по всіх кварталах")
+
+blocs = read_voting_blocs()
+
+if blocs is None or blocs[0].empty:
+    st.info("Аналітика голосувань ще не порахована — вона з'явиться після наступного оновлення даних.")
+    st.stop()
+
+cohesion_df, agreement_df = blocs
+
+# --- Згуртованість фракцій (індекс Райса) ---
+
+st.divider()
+st.write("#### Згуртованість фракцій")
+st.caption(
+    "Індекс Райса: 1 — уся фракція голосує однаково, 0 — фракція розкололась навпіл. "
+    "«Проти» та «Утримався» рахуються разом, бо рішення ухвалюють лише голоси «За»."
+)
+
+summary = cohesion_df.groupby('party')['rice'].agg(['mean', 'median', 'count']).sort_values('mean')
+
+c1, c2 = st.columns(2)
+with c1:
+    st.bar_chart(summary['mean'], horizontal=True)
+with c2:
+    table = summary.sort_values('mean', ascending=False).rename(columns={
+        'mean': "Середній індекс", 'median': "Медіана", 'count': "Голосувань",
+    })
+    table.index.name = "Фракція"
+    st.dataframe(table.round(2), use_container_width=True)
+
+party = st.selectbox("Де фракція розколювалась найбільше", options=list(summary.index[::-1]))
+split_df = cohesion_df[cohesion_df['party'] == party].nsmallest(10, 'rice')
+st.dataframe(
+    split_df[['date', 'gl_text', 'rice']].rename(columns={'date': "Дата", 'gl_text': "Питання", 'rice': "Індекс Райса"}).round(2),
+    use_container_width=True,
+    hide_index=True,
+)
+
+# --- Збіг голосів депутат × депутат ---
+
+st.divider()
+st.write("#### Збіг голосів депутатів")
+st.caption("Частка питань, у яких обидва депутати взяли участь і проголосували однаково.")
+
+deputies = reps_df.set_index('id').loc[lambda df: df.index.isin(agreement_df.index)]
+order = deputies.sort_values(['party', 'name']).index
+labels = [f"{deputies.at[i, 'name']} ({deputies.at[i, 'party']})" for i in order]
+
+fig = px.imshow(
+    agreement_df.reindex(index=order, columns=order).to_numpy(),
+    x=labels,
+    y=labels,
+    zmin=0,
+    zmax=1,
+    color_continuous_scale="Greys",
+    aspect="auto",
+)
+fig.update_layout(height=800, margin=dict(l=0, r=0, t=0, b=0), xaxis_showticklabels=False)
+fig.update_traces(hovertemplate="%{y}<br>%{x}<br>Збіг: %{z:.0%}<extra></extra>")
+st.plotly_chart(fig, use_container_width=True)
+
+deputy_id = st.selectbox(
+    "Депутат",
+    options=list(order),
+    format_func=lambda i: deputies.at[i, 'name'],
+)
+similar = agreement_df.loc[deputy_id].drop(deputy_id).dropna().sort_values(ascending=False)
+similar_df = deputies.loc[similar.index, ['name', 'party']].assign(agreement=similar.values)
+similar_df = similar_df.rename(columns={'name': "Депутат", 'party': "Фракція", 'agreement': "Збіг"})
+
+s1, s2 = st.columns(2)
+with s1:
+    st.write("##### Голосують найбільш схоже")
+    st.dataframe(similar_df.head(10).round(2), use_container_width=True, hide_index=True)
+with s2:
+    st.write("##### Голосують найменш схоже")
+    st.dataframe(similar_df.tail(10).iloc[::-1].round(2), use_container_width=True, hide_index=True)
+
+render_data_footer({
+    "Депутати Київради": DEPUTIES_URL,
+    **{f"Поіменні голосування ({q})": url for q, url in VOTING_QUARTERS.items()},
+})
@@ -1,20 +1,10 @@
+import time
 import streamlit as st
-import anthropic
-from docs import find_doc, fetch_pdf_bytes, build_api_messages, get_doc_summary
-
-PREMADE_QUESTIONS = [
-    "Поясни мені це рішення простими словами",
-    "Як це рішення впливає саме на мене",
-    "Які існують ризики в цьому документі",
-]
-
-SYSTEM_PROMPT = (
-    "Ти — помічник, який допомагає громадянам України розібратися в рішеннях Київської міської ради. "
-    "Відповідай українською мовою, чітко і стисло, без зайвого юридичного жаргону. "
-    "Якщо до повідомлення прикріплено PDF-документ, спирайся насамперед на його зміст. "
-    "Правила форматування: не використовуй емодзі; якщо потрібні заголовки — використовуй лише рівень #### і нижче; "
-    "відповідь має бути стислою."
-)
+import llm
+from metrics import record
+from data import ASSISTANT_SYSTEM_PROMPT
+from docs import LLM_BUSY_MESSAGE, PREMADE_QUESTIONS, fetch_pdf_bytes, fetch_doc_text, build_api_messages, get_doc_summary
+from answers import ANSWER_MODEL, ANSWER_MAX_TOKENS, answer_key, read_answer, write_answer, replay_answer
 
 
 # --- Сторінка чату ---
@@ -57,20 +47,31 @@ if user_input:
     with st.chat_message("user"):
         st.write(user_input)
 
-    pdf_bytes = (
-        fetch_pdf_bytes(result["doc_url"])
-        if result["doc_url"].endswith(".pdf") or "old.kmr.gov.ua" in result["doc_url"]
-        else None
-    )
-    api_messages = build_api_messages(messages, pdf_bytes)
-
-    client = anthropic.Anthropic(api_key=st.secrets["ANTHROPIC_API_KEY"])
+    # Перше питання не залежить від історії — відповідь спільна для всіх сесій
+    key = answer_key(result["doc_url"], user_input, ASSISTANT_SYSTEM_PROMPT) if len(messages) == 1 else None
+    cached = read_answer(key) if key else None
     with st.chat_message("assistant"):
-        with client.messages.stream(
-            model="claude-haiku-4-5",
-            max_tokens=1024,
-            system=SYSTEM_PROMPT,
-            messages=api_messages,
-        ) as stream:
-            response_text = st.write_stream(stream.text_stream)
+        if cached:
+            started = time.perf_counter()
+            response_text = st.write_stream(replay_answer(cached))
+            record("chat", "answer_cache", latency_ms=(time.perf_counter() - started) * 1000)
+        else:
+            doc_text = fetch_doc_text(result["doc_url"], user_input)
+            pdf_bytes = None if doc_text else fetch_pdf_bytes(result["doc_url"])
+            api_messages = build_api_messages(messages, pdf_bytes, doc_text)
+            try:
+                with llm.stream(
+                    purpose="chat",
+                    path="text" if doc_text else "pdf" if pdf_bytes else "history",
+                    model=ANSWER_MODEL,
+                    max_tokens=ANSWER_MAX_TOKENS,
+                    system=ASSISTANT_SYSTEM_PROMPT,
+                    messages=api_messages,
+                ) as text_stream:
+                    response_text = st.write_stream(text_stream)
+                if key:
+                    write_answer(key, response_text, result["doc_url"], user_input)
+            except llm.LLMBusy:
+                response_text = f"{LLM_BUSY_MESSAGE}\n\n{get_doc_summary(result['doc_url'], result['title'])}"
+                st.write(response_text)
     messages.append({"role": "assistant", "text": response_text})
@@ -0,0 +1,96 @@
+import streamlit as st
+import plotly.express as px
+from utils import render_data_footer
+from data import FX_RATES, NAZK_PUBLIC
+from declarations import load_declaration_stats, unconverted_currencies
+
+METRICS = {
+    "total_income": "Дохід декларанта, грн",
+    "uah_cash": "Грошові активи, грн",
+    "uah_liabilities": "Фінансові зобов'язання, грн",
+    "uah_net": "Гроші мінус зобов'язання, грн",
+    "realty_count": "Об'єктів нерухомості",
+    "realty_area": "Площа нерухомості, м²",
+    "land_area": "Площа землі, м²",
+    "vehicles_count": "Транспортних засобів",
+    "securities_count": "Цінних паперів",
+    "corporate_rights_count": "Корпоративних прав",
+}
+
+st.title("Декларації депутатів")
+st.subheader("Останні декларації всіх депутатів в одній таблиці — рейтинг і порівняння")
+
+with st.expander("Курси валют для перерахунку в гривні"):
+    rates = {
+        cur: st.number_input(f"{cur}, грн", value=float(rate), min_value=0.0, step=0.1, key=f"fx_{cur}")
+        for cur, rate in FX_RATES.items() if cur != "UAH"
+    }
+    rates["UAH"] = 1.0
+
+stats_df = load_declaration_stats(rates)
+
+if stats_df.empty:
+    st.info("Зведення декларацій ще не зібране. Воно оновлюється офлайн: python prefetch.py && python declarations.py")
+    st.stop()
+
+missing = unconverted_currencies(stats_df, rates)
+if missing:
+    st.caption(f"Без курсу, не враховано в сумах у гривнях: {', '.join(missing)}")
+
+# --- Рейтинг ---
+
+st.divider()
+st.write("#### Рейтинг")
+c1, c2 = st.columns([2, 1])
+metric = c1.selectbox("Показник", options=list(METRICS), format_func=METRICS.get)
+parties = c2.multiselect("Фракції", options=sorted(stats_df['party'].dropna().unique()))
+
+ranked_df = stats_df[stats_df['party'].isin(parties)] if parties else stats_df
+ranked_df = ranked_df.sort_values(metric, ascending=False)
+
+fig = px.bar(
+    ranked_df.head(20).iloc[::-1],
+    x=metric,
+    y="name",
+    color="party",
+    orientation="h",
+    labels={metric: METRICS[metric], "name": "", "party": "Фракція"},
+)
+fig.update_layout(height=600, margin=dict(l=0, r=0, t=0, b=0))
+st.plotly_chart(fig, use_container_width=True)
+
+table = ranked_df[['name', 'party', 'year', metric]].assign(
+    url=NAZK_PUBLIC + "/" + ranked_df['doc_id'],
+).rename(columns={'name': "Депутат", 'party': "Фракція", 'year': "Рік", metric: METRICS[metric], 'url': "Декларація"})
+st.dataframe(
+    table,
+    use_container_width=True,
+    hide_index=True,
+    column_config={"Декларація": st.column_config.LinkColumn(display_text="НАЗК ↗")},
+)
+
+# --- Порівняння ---
+
+st.divider()
+st.write("#### Порівняння депутатів")
+by_id = stats_df.set_index('deputy_id')
+selected = st.multiselect(
+    "Депутати",
+    options=list(by_id.sort_values('name').index),
+    format_func=lambda i: by_id.at[i, 'name'],
+    max_selections=5,
+)
+if selected:
+    compare_df = by_id.loc[selected, list(METRICS)].rename(columns=METRICS)
+    compare_df.index = [by_id.at[i, 'name'] for i in selected]
+    st.dataframe(compare_df.T.round(0), use_container_width=True)
+
+# --- По фракціях ---
+
+st.divider()
+st.write("#### Медіани по фракціях")
+party_df = stats_df.groupby('party')[list(METRICS)].median().rename(columns=METRICS)
+party_df.index.name = "Фракція"
+st.dataframe(party_df.round(0), use_container_width=True)
+
+render_data_footer({"Декларації НАЗК": NAZK_PUBLIC})
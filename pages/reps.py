@@ -1,10 +1,14 @@
 import re
 import streamlit as st
 from urllib.parse import quote
-from utils import load_deputies, get_party_badge, geocode_postal_code, render_data_footer, deputy_avatar
+from utils import load_deputies, get_party_badge, get_badge, geocode_postal_code, render_data_footer, get_avatar_html, paginate, render_pagination
 from data import DEPUTIES_URL
 from nazk import show_declaration
-from ui import get_card_marker
+from declarations import show_declaration_changes
+from ui import VOTE_COLORS, get_card_marker
+from analytics import read_deputy_profiles
+
+REP_CARDS_PER_PAGE = 12
 
 reps_df = load_deputies()
 
@@ -12,6 +16,11 @@ if reps_df.empty:
     st.error("Не вдалося завантажити дані з data.gov.ua — портал може бути тимчасово недоступний. Спробуйте пізніше.")
     st.stop()
 
+# Профілі голосувань по всіх кварталах — лише готова таблиця etl.py; поки її немає, блок «Голосування» не показується
+profiles_df = read_deputy_profiles()
+if profiles_df is not None:
+    profiles_df = profiles_df.set_index('id')
+
 # Заголовок сторінки
 st.title("Склад Київської міської ради")
 st.subheader("Склад ради, контактні дані депутатів, їхні декларації пошук за індексом дільниці та інша корисна інформація для виборців")
@@ -71,33 +80,55 @@ if zip_district:
 # Показ кількості знайдених результатів
 st.caption(f"Знайдено депутатів: {len(filtered_df)}")
 
-# Картки
+# Картки: лише поточна сторінка, статичні частини картки — одним markdown-блоком
+page_df, pages = paginate(filtered_df, REP_CARDS_PER_PAGE, "reps_page")
 cols = st.columns(3)
 
 if not filtered_df.empty:
-    for i, dep in enumerate(filtered_df.itertuples()):
+    for i, dep in enumerate(page_df.itertuples()):
         with cols[i % 3]:
             with st.container(border=True):
-                st.markdown(get_card_marker(dep.party), unsafe_allow_html=True)
-                deputy_avatar(int(dep.id), dep.name, dep.party)
-                st.markdown(f"#### {dep.name}")
-                st.markdown(get_party_badge(dep.party), unsafe_allow_html=True)
+                st.markdown(
+                    get_card_marker(dep.party)
+                    + get_avatar_html(int(dep.id), dep.name, dep.party)
+                    + f"\n\n#### {dep.name}\n\n"
+                    + get_party_badge(dep.party),
+                    unsafe_allow_html=True,
+                )
+
+                if profiles_df is not None and int(dep.id) in profiles_df.index and profiles_df.loc[int(dep.id), 'questions']:
+                    profile = profiles_df.loc[int(dep.id)]
+                    with st.container(border=True):
+                        st.markdown(
+                            "##### Голосування\n\n"
+                            f"**Участь:** {profile['participation']:.0%} з {int(profile['questions'])} питань<br>"
+                            + " ".join(get_badge(f"{v} {profile[v]:.0%}", VOTE_COLORS[v]) for v in ("За", "Проти", "Утримався"))
+                            + f"<br>**Проти більшості фракції:** {profile['against_faction']:.0%}"
+                            f"<br>**Найдовша серія пропусків:** {int(profile['longest_absence'])} питань",
+                            unsafe_allow_html=True,
+                        )
 
                 with st.container(border=True):
-                    st.write("##### Контакти")
                     maps_url = f"https://www.google.com/maps/search/?api=1&query={quote(dep.address)}"
                     phone_clean = dep.phone.replace("(", "").replace(")", "").replace(" ", "").replace("-", "")
-                    st.write(f"**Адреса:** {dep.address}")
-                    st.link_button("На мапі ↗", maps_url)
-                    st.write(f"**Телефон:** {dep.phone}")
-                    st.link_button("Телефонувати ↗", f"tel:{phone_clean}")
+                    st.markdown(
+                        "##### Контакти\n\n"
+                        f"**Адреса:** {dep.address}\n\n"
+                        f'<a class="link-btn" href="{maps_url}" target="_blank">На мапі ↗</a>\n\n'
+                        f"**Телефон:** {dep.phone}\n\n"
+                        f'<a class="link-btn" href="tel:{phone_clean}">Телефонувати ↗</a>',
+                        unsafe_allow_html=True,
+                    )
 
                 with st.container(border=True):
                     st.write("##### Декларація")
                     st.caption(
                         "Дані завантажуються напряму з реєстру НАЗК в реальному часі, тому аби не було затримок, ми показуємо лише основну інформацію. "
                     )
-                    show_declaration(dep.name, dep)
+                    shown_id = show_declaration(dep.name, dep)
+                    if shown_id:
+                        show_declaration_changes(dep.name, shown_id, dep.id)
+    render_pagination(pages, "reps_page")
 else:
     st.info("Представників за вашим запитом не знайдено. Спробуйте змінити параметри фільтрації.")
 
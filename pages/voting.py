@@ -1,50 +1,46 @@
 import streamlit as st
 import pandas as pd
-import json
-import zipfile
-import requests
-import io
-from utils import load_deputies, to_short_name, simplify_data, render_data_footer, get_party_badge, get_badge, deputy_avatar
-from data import VOTING_QUARTERS, DEPUTIES_URL, UA
+from utils import load_deputies, content_hash, render_data_footer, get_vote_card_html, render_card_grid, paginate, render_pagination
+from data import VOTING_QUARTERS, DEPUTIES_URL
 from ui import EMPTY_VOTE_MESSAGES, VOTE_COLORS, get_vote_marker
-from docs import render_doc_buttons
+from docs import render_doc_buttons, load_decision_links
+from search import load_search_index, search_titles
+from votes import (
+    VOTE_BARRIER, load_voting_archive, get_reps_lookup, build_title_index,
+    build_vote_matrix, load_vote_matrix, get_question_votes,
+)
 
-# --- Завантаження даних ---
+VOTE_CARDS_PER_PAGE = 40
 
-@st.cache_data
-def load_voting_archive(url):
-    """Завантажує ZIP-архів поіменних голосувань з data.gov.ua. Повертає bytes або None."""
-    try:
-        r = requests.get(url, headers=UA, timeout=30)
-        if r.status_code != 200 or r.content[:2] != b'PK':
-            return None
-        return r.content
-    except:
-        return None
+# --- Завантаження даних ---
 
-@st.cache_data
-def get_voting_titles(archive_bytes):
-    """Витягує назви питань з кожного JSON у ZIP → {скорочена_назва: filename}."""
+def get_voting_titles(title_index):
+    """Індекс назв архіву → {скорочена_назва: filename}."""
     titles_map = {}
-    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as z:
-        files = sorted([f for f in z.namelist() if f.endswith('.json') and not f.startswith('__')])
-        for filename in files:
-            with z.open(filename) as f:
-                data = json.load(f)
-                full_title = data.get('GL_Text', filename)
-                short_title = (full_title[:100] + '...') if len(full_title) > 100 else full_title
-                titles_map[short_title] = filename
+    for entry in title_index:
+        full_title = entry['gl_text']
+        short_title = (full_title[:100] + '...') if len(full_title) > 100 else full_title
+        titles_map[short_title] = entry['filename']
     return titles_map
 
-def merge_votes(data, reps_lookup):
-    """JSON одного голосування + довідник представників → DataFrame з повним ПІБ, фракцією та результатом."""
-    votes_df = pd.DataFrame(data['DPList'])
-    votes_df.columns = ['raw_name', 'vote_result']
-    votes_df['match_key'] = votes_df['raw_name'].str.replace(r'\s+', ' ', regex=True).str.strip()
-    votes_df['vote_clean'] = votes_df['vote_result'].str.replace(".", "").str.strip().replace("", "Не голосував")
-    votes_df = simplify_data(pd.merge(votes_df, reps_lookup, on='match_key', how='left'))
-    votes_df['full_name'] = votes_df['full_name'].fillna(votes_df['raw_name'])
-    return votes_df
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_quarter_titles(url):
+    """
+    (хеш архіву, індекс назв, {скорочена_назва: filename}) кварталу або None. ZIP хешується й читається
+    раз на годину за URL, а не на кожен rerun; індекс назв build_title_index лежить на диску за хешем.
+    """
+    archive_data = load_voting_archive(url)
+    if not archive_data:
+        return None
+    title_index = build_title_index(archive_data)
+    return content_hash(archive_data), title_index, get_voting_titles(title_index)
+
+
+@st.cache_data(show_spinner=False)
+def get_matrix_dir(url, archive_hash, reps_lookup):
+    """Тека матриці голосів архіву (build_vote_matrix) — ключ кешу URL + хеш архіву, тож ZIP не хешується повторно."""
+    return str(build_vote_matrix(load_voting_archive(url), reps_lookup))
 
 # --- Підготовка даних: депутати + архів голосувань ---
 
@@ -53,8 +49,7 @@ if reps_df.empty:
     st.error("Не вдалося завантажити дані з data.gov.ua — портал може бути тимчасово недоступний. Спробуйте пізніше.")
     st.stop()
 
-reps_df['match_key'] = reps_df['name'].apply(to_short_name)
-reps_lookup = reps_df[['id', 'match_key', 'name', 'party']].rename(columns={'name': 'full_name'})
+reps_lookup = get_reps_lookup(reps_df)
 
 # --- UI: вибір голосування, показ результатів, фільтри ---
 
@@ -72,39 +67,55 @@ if not selected_quarters:
     st.stop()
 
 # Завантажуємо архіви для всіх вибраних кварталів та об'єднуємо питання
-combined_titles = {}  # title -> (archive_bytes, filename)
+combined_titles = {}  # title -> (url, archive_hash, filename)
+title_lookup = {}     # (archive_hash, filename) -> title
+title_indexes = {}    # archive_hash -> індекс назв для пошуку
 for quarter in selected_quarters:
-    archive_data = load_voting_archive(VOTING_QUARTERS[quarter])
-    if archive_data:
-        for title, filename in get_voting_titles(archive_data).items():
-            combined_titles[title] = (archive_data, filename)
+    url = VOTING_QUARTERS[quarter]
+    loaded = load_quarter_titles(url)
+    if loaded:
+        archive_hash, title_index, titles = loaded
+        title_indexes[archive_hash] = title_index
+        for title, filename in titles.items():
+            combined_titles[title] = (url, archive_hash, filename)
+            title_lookup[(archive_hash, filename)] = title
 
 if not combined_titles:
     st.error("Не вдалося завантажити дані з data.gov.ua — портал може бути тимчасово недоступний. Спробуйте пізніше.")
     st.stop()
 
-filtered_titles = {k: v for k, v in combined_titles.items() if title_search.lower() in k.lower()} if title_search else combined_titles
+# Пошук по повних назвах через один індекс усіх кварталів (etl.py), результати — за релевантністю у вибраних
+if title_search:
+    all_quarters = filter(None, map(load_quarter_titles, VOTING_QUARTERS.values()))
+    search_index = load_search_index({archive_hash: title_index for archive_hash, title_index, _ in all_quarters})
+    found = search_titles(search_index, title_search, keys=title_indexes.keys())
+    hits = [title_lookup.get((doc["key"], doc["filename"])) for doc in found]
+    filtered_titles = {title: combined_titles[title] for title in hits if title}
+else:
+    filtered_titles = combined_titles
 if not filtered_titles:
     st.warning("Нічого не знайдено за вашим запитом.")
     st.stop()
 
 selected_display_title = st.selectbox("Питання", options=list(filtered_titles.keys()))
-selected_archive, selected_filename = filtered_titles[selected_display_title]
+selected_url, selected_hash, selected_filename = filtered_titles[selected_display_title]
 
-with zipfile.ZipFile(io.BytesIO(selected_archive)) as z:
-    with z.open(selected_filename) as f:
-        data = json.load(f)
+# Питання — один стовпець матриці голосів (memory-map). Матриця будується лише для архіву обраного питання
+matrix, rows_df, questions_df = load_vote_matrix(get_matrix_dir(selected_url, selected_hash, reps_lookup))
+question = questions_df[questions_df['filename'] == selected_filename].iloc[0]
+votes_df = get_question_votes(matrix, rows_df, int(question['col']))
 
-votes_df = merge_votes(data, reps_lookup)
-
-barrier = 61
-count_za = len(votes_df[votes_df['vote_clean'] == "За"])
-count_proti = len(votes_df[votes_df['vote_clean'] == "Проти"])
-count_utrim = len(votes_df[votes_df['vote_clean'] == "Утримався"])
+barrier = VOTE_BARRIER
+count_za = int(question["За"])
+count_proti = int(question["Проти"])
+count_utrim = int(question["Утримався"])
 passed = count_za >= barrier
 
-st.markdown(f"### {data.get('GL_Text', 'Деталі голосування')}")
-render_doc_buttons(data.get('GL_Text', ''), passed=passed)
+# Рішення для питання — з таблиці зв'язків усього архіву (будується один раз на архів)
+decision_links = load_decision_links(selected_hash, title_indexes[selected_hash])
+
+st.markdown(f"### {question['gl_text'] or 'Деталі голосування'}")
+render_doc_buttons(question['gl_text'], passed=passed, result=decision_links.get(selected_filename))
 
 # --- Табло: прийнято/не прийнято + метрики За/Проти/Утримались ---
 
@@ -179,19 +190,13 @@ if vote_types:
 
 st.caption(f"Відображено депутатів: {len(filtered_df)}")
 
-cols = st.columns(4)
-for i, row in enumerate(filtered_df.itertuples()):
-    with cols[i % 4]:
-        with st.container(border=True):
-            st.markdown(get_vote_marker(row.vote_clean), unsafe_allow_html=True)
-            deputy_avatar(int(row.id) if pd.notna(row.id) else 0, row.full_name, row.party, size=48)
-            st.write(f"**{row.full_name}**")
-            color = VOTE_COLORS.get(row.vote_clean, "#999999")
-            st.markdown(
-                get_party_badge(row.party) + " " +
-                get_badge(row.vote_clean, color),
-                unsafe_allow_html=True,
-            )
+# Картки поточної сторінки — один HTML-блок
+page_df, pages = paginate(filtered_df, VOTE_CARDS_PER_PAGE, "votes_page")
+render_card_grid([
+    get_vote_card_html(int(row.id) if pd.notna(row.id) else 0, row.full_name, row.party, row.vote_clean)
+    for row in page_df.itertuples()
+], columns=4)
+render_pagination(pages, "votes_page")
 
 render_data_footer({
     "Депутати Київради": DEPUTIES_URL,
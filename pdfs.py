@@ -0,0 +1,135 @@
+"""
+pdfs.py — сховище PDF рішень на диску.
+
+Оригінал качається потоково через downloads.fetch (content-addressed кеш, ETag / If-Modified-Since,
+ліміт PDF_MAX_BYTES), обрізана до PDF_MAX_PAGES копія зберігається один раз:
+CACHE_DIR/pdfs/<sha256 оригіналу>.pdf. Читання — через memory-map, тож огляд, чат і всі сесії
+репліки користуються однією копією; на сервері вона перевіряється не частіше ніж раз на REVALIDATE_AFTER.
+
+Для LLM замість сирого PDF — текст сторінок (pypdf, зберігається поруч) і лише сторінки,
+релевантні питанню (BM25 з search.py), тож довжина рішення не обмежена PDF_MAX_PAGES.
+"""
+
+import json
+import mmap
+import shutil
+import numpy as np
+from pathlib import Path
+from datetime import timedelta
+from pypdf import PdfReader, PdfWriter
+from data import CACHE_DIR
+from downloads import fetch, cached_path, is_fresh
+from search import bm25_scores
+from utils import atomic_path, write_json
+
+PDFS_DIR = CACHE_DIR / "pdfs"
+
+PDF_MAX_PAGES = 20
+PDF_MAX_BYTES = 50 * 1024 * 1024
+DOC_CONTEXT_CHARS = 12000  # ~3-4 тис. токенів тексту рішення на одне питання
+REVALIDATE_AFTER = timedelta(hours=24)
+
+
+def is_pdf(head: bytes) -> bool:
+    """Сигнатура %PDF на початку файлу (а не HTML-сторінка помилки)."""
+    return b"%PDF-" in head[:1024]
+
+
+def is_pdf_url(url: str) -> bool:
+    """Посилання веде на PDF (а не на сторінку ligazakon)."""
+    return url.endswith(".pdf") or "old.kmr.gov.ua" in url
+
+
+def truncate_pdf(src: Path, dst: Path):
+    """Перші PDF_MAX_PAGES сторінок src → dst (атомарно). Короткий файл лише копіюється."""
+    reader = PdfReader(src)
+    with atomic_path(dst) as tmp_path:
+        if len(reader.pages) <= PDF_MAX_PAGES:
+            shutil.copyfile(src, tmp_path)
+        else:
+            writer = PdfWriter()
+            for page in reader.pages[:PDF_MAX_PAGES]:
+                writer.add_page(page)
+            with open(tmp_path, "wb") as f:
+                writer.write(f)
+
+
+def get_original_path(url: str) -> Path | None:
+    """Повний PDF у кеші downloads.py (завантажує/перевіряє за потреби) або None."""
+    original = cached_path(url) if is_fresh(url, REVALIDATE_AFTER) else None
+    return original or fetch(url, validate=is_pdf, max_bytes=PDF_MAX_BYTES)
+
+
+def get_pdf_path(url: str) -> Path | None:
+    """Шлях до обрізаної копії PDF за URL (завантажує/перевіряє за потреби) або None."""
+    original = get_original_path(url)
+    if original is None:
+        return None
+    path = PDFS_DIR / f"{original.name}.pdf"
+    if not path.exists():
+        try:
+            truncate_pdf(original, path)
+        except Exception:
+            return None  # пошкоджений PDF — працюємо лише з назвою рішення
+    return path
+
+
+def open_pdf(url: str) -> mmap.mmap | None:
+    """Обрізаний PDF як memory-map (bytes-подібний, лише читання) або None."""
+    path = get_pdf_path(url) if is_pdf_url(url) else None
+    if path is None or path.stat().st_size == 0:
+        return None
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_pdf_pages(url: str) -> list[str]:
+    """
+    Текст кожної сторінки повного PDF (без обмеження PDF_MAX_PAGES) — витягується pypdf один раз
+    і зберігається в PDFS_DIR/<sha256 оригіналу>.pages.json. Скан без текстового шару → порожні рядки.
+    """
+    original = get_original_path(url) if is_pdf_url(url) else None
+    if original is None:
+        return []
+    path = PDFS_DIR / f"{original.name}.pages.json"
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    try:
+        pages = [" ".join((page.extract_text() or "").split()) for page in PdfReader(original).pages]
+    except Exception:
+        return []
+    write_json(path, pages)
+    return pages
+
+
+def select_pages(pages: list[str], query: str = "", budget: int = DOC_CONTEXT_CHARS) -> str:
+    """
+    Сторінки, найрелевантніші запиту (BM25), в межах budget символів — у порядку документа.
+    Перша сторінка (назва, преамбула) — завжди; без запиту — сторінки з початку.
+    """
+    scores = bm25_scores(pages, query) if query else np.zeros(len(pages))
+    ranked = [i for i in np.argsort(-scores, kind="stable") if scores[i] > 0]
+    candidates = list(dict.fromkeys([0, *ranked, *range(len(pages))]))
+    chosen, used = [], 0
+    for i in candidates:
+        text = pages[i]
+        if not text:
+            continue
+        if used + len(text) > budget:
+            if chosen:
+                continue
+            text = text[:budget]
+        chosen.append((i, text))
+        used += len(text)
+        if used >= budget:
+            break
+    return "\n\n".join(f"— Сторінка {i + 1} —\n{text}" for i, text in sorted(chosen))
+
+
+def get_doc_text(url: str, query: str = "") -> str | None:
+    """Вибрані сторінки тексту рішення для LLM або None (немає PDF або це скан без тексту)."""
+    pages = load_pdf_pages(url)
+    if not any(pages):
+        return None
+    return select_pages(pages, query)
@@ -0,0 +1,134 @@
+"""
+prefetch.py — фонове завантаження декларацій НАЗК для всіх депутатів у сховище store.py.
+
+Для кожного депутата з load_deputies — пошук /documents/list за ПІБ, вибір декларанта (nazk.resolve_declarant —
+тезки відсіюються), пошук за його user_declarant_id і декларації /documents/{uuid} (asyncio + httpx):
+не більше NAZK_CONCURRENCY запитів одночасно і не частіше NAZK_RATE запитів за секунду, повтори з затримкою
+при 429/5xx. Результати лягають у таблиці nazk_searches / nazk_documents, які nazk.search_declarations
+і nazk.load_declaration читають першими, тож клік «Дивитись ↙» на картці відкривається без запитів до API.
+Подана декларація не змінюється, тому вже збережені документи повторно не завантажуються; пошук
+оновлюється щоразу (нові та виправлені подання — нові uuid).
+
+Запуск окремо: python prefetch.py [--rate N] [--concurrency N] [--latest]
+"""
+
+import sys
+import random
+import asyncio
+import httpx
+from data import UA, NAZK_API
+from store import connect, read_document, write_documents
+from nazk import declaration_query, parse_search, resolve_declarant, search_key
+
+NAZK_RATE = 5  # запитів за секунду
+NAZK_CONCURRENCY = 4
+NAZK_RETRIES = 3
+NAZK_TIMEOUT = 15
+
+
+def _rate_limiter(rate: float):
+    """Корутина-затвор: кожен наступний виклик не раніше ніж через 1/rate с після попереднього."""
+    lock = asyncio.Lock()
+    next_at = 0.0
+
+    async def wait():
+        nonlocal next_at
+        async with lock:
+            now = asyncio.get_running_loop().time()
+            delay = max(0.0, next_at - now)
+            next_at = max(now, next_at) + 1 / rate
+            await asyncio.sleep(delay)
+
+    return wait
+
+
+async def _get_json(client: httpx.AsyncClient, url: str, params: dict | None, wait_turn, slots) -> dict | None:
+    """GET → JSON або None. 429 і 5xx повторюються з експоненційною затримкою і jitter."""
+    for attempt in range(NAZK_RETRIES):
+        async with slots:
+            await wait_turn()
+            try:
+                r = await client.get(url, params=params)
+            except httpx.HTTPError:
+                r = None
+        if r is not None and r.status_code == 200:
+            try:
+                return r.json()
+            except ValueError:
+                return None
+        if r is not None and r.status_code not in (429, 500, 502, 503, 504):
+            return None
+        await asyncio.sleep(2 ** attempt + random.random())
+    return None
+
+
+def _resolve(name: str, searches: dict) -> dict | None:
+    """Декларант депутата name у відповіді пошуку за ПІБ (nazk.resolve_declarant) або None."""
+    data = searches.get(declaration_query(name))
+    return resolve_declarant(name, parse_search(data)) if data else None
+
+
+def _declaration_ids(name: str, identity: dict | None, searches: dict, latest_only: bool) -> list[str]:
+    """uuid чинних декларацій декларанта: з пошуку за його id, інакше з пошуку за ПІБ; найновіші першими."""
+    if identity is None:
+        return []
+    by_id = searches.get(search_key("", identity["user_declarant_id"])) if identity["user_declarant_id"] else None
+    docs = parse_search(by_id or searches[declaration_query(name)])
+    docs = [d for d in docs if d["declarant_key"] == identity["key"]]
+    return [d["id"] for d in (docs[:1] if latest_only else docs)]
+
+
+async def prefetch_declarations(names, rate: float = NAZK_RATE, concurrency: int = NAZK_CONCURRENCY,
+                                latest_only: bool = False) -> tuple[dict, dict, int]:
+    """
+    ПІБ депутатів → ({ключ nazk.search_key: відповідь пошуку}, {uuid: нова декларація}, кількість уже збережених).
+    Пошуки — за ПІБ і за user_declarant_id обраного декларанта (його сторінка читає першим).
+    Документи, які вже є у сховищі, не завантажуються.
+    """
+    names = list(names)
+    queries = sorted({declaration_query(name) for name in names} - {""})
+    wait_turn = _rate_limiter(rate)
+    slots = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(headers=UA, timeout=NAZK_TIMEOUT, follow_redirects=True) as client:
+        found = await asyncio.gather(*(
+            _get_json(client, f"{NAZK_API}/documents/list", {"query": q}, wait_turn, slots) for q in queries
+        ))
+        searches = {q: data for q, data in zip(queries, found) if data}
+
+        identities = {name: _resolve(name, searches) for name in names}
+        declarant_ids = sorted({i["user_declarant_id"] for i in identities.values() if i and i["user_declarant_id"]})
+        found = await asyncio.gather(*(
+            _get_json(client, f"{NAZK_API}/documents/list", {"user_declarant_id": uid}, wait_turn, slots)
+            for uid in declarant_ids
+        ))
+        searches.update({search_key("", uid): data for uid, data in zip(declarant_ids, found) if data})
+
+        doc_ids = list(dict.fromkeys(
+            doc_id for name in names
+            for doc_id in _declaration_ids(name, identities[name], searches, latest_only)
+        ))
+        missing = [doc_id for doc_id in doc_ids if read_document("nazk_documents", doc_id) is None]
+        raws = await asyncio.gather(*(
+            _get_json(client, f"{NAZK_API}/documents/{doc_id}", None, wait_turn, slots) for doc_id in missing
+        ))
+    documents = {doc_id: raw for doc_id, raw in zip(missing, raws) if raw}
+    return searches, documents, len(doc_ids) - len(missing)
+
+
+def prefetch(names, rate: float = NAZK_RATE, concurrency: int = NAZK_CONCURRENCY, latest_only: bool = False) -> dict:
+    """Завантажує і зберігає в сховище. Повертає {"searches", "documents" (нових), "known" (вже збережених)}."""
+    searches, documents, known = asyncio.run(prefetch_declarations(names, rate, concurrency, latest_only))
+    conn = connect()
+    write_documents(conn, "nazk_searches", searches)
+    write_documents(conn, "nazk_documents", documents)
+    conn.close()
+    return {"searches": len(searches), "documents": len(documents), "known": known}
+
+
+if __name__ == "__main__":
+    from utils import load_deputies
+
+    rate = float(sys.argv[sys.argv.index("--rate") + 1]) if "--rate" in sys.argv else NAZK_RATE
+    concurrency = int(sys.argv[sys.argv.index("--concurrency") + 1]) if "--concurrency" in sys.argv else NAZK_CONCURRENCY
+    stats = prefetch(load_deputies()["name"], rate, concurrency, latest_only="--latest" in sys.argv)
+    print(f"Пошуків: {stats['searches']}, нових декларацій: {stats['documents']}, вже у сховищі: {stats['known']}")
@@ -0,0 +1,217 @@
+"""
+search.py — повнотекстовий пошук по назвах питань голосувань.
+
+Один інвертований індекс по повному GL_Text питань усіх архівів VOTING_QUARTERS: легкий український
+стемер (відкидання закінчень), BM25-ранжування, префіксний збіг і триграмний fallback для
+одруківок. Вибір кварталів на сторінці — лише фільтр результатів (search_titles(keys=...)), тож індекс
+не перебудовується. Будується офлайн (etl.py), зберігається в CACHE_DIR/search/<ключ>.json і тримається
+в пам'яті процесу.
+"""
+
+import re
+import json
+import math
+import bisect
+import numpy as np
+import streamlit as st
+from collections import Counter, defaultdict
+from functools import lru_cache
+from data import CACHE_DIR
+from utils import content_hash, write_json
+
+SEARCH_DIR = CACHE_DIR / "search"
+
+# Закінчення, які відкидає стемер (найдовші першими). Основа має лишитись не коротшою за STEM_MIN_LEN
+UA_ENDINGS = sorted([
+    "ями", "ами", "ові", "еві", "ого", "ому", "ими", "іми", "ього", "ьому", "ість", "ості",
+    "ння", "нню", "нням", "ннями", "ннях",
+    "их", "іх", "ий", "ій", "ої", "ою", "ею", "ям", "ах", "ях", "ам", "ом", "ем", "ів", "ей",
+    "ти", "ть", "ся", "ла", "ло", "ли",
+    "а", "я", "у", "ю", "і", "и", "е", "о", "ь", "ї",
+], key=len, reverse=True)
+STEM_MIN_LEN = 3
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_WEIGHT = 0.9
+PREFIX_MAX_TERMS = 20
+TRIGRAM_MIN_SIMILARITY = 0.35
+TRIGRAM_MAX_TERMS = 5
+
+
+def normalize(text: str) -> str:
+    """Нижній регістр і єдиний апостроф (’ ʼ ` → ')."""
+    return re.sub(r"[’ʼ`‘]", "'", str(text).lower())
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Легкий стемер: 'бюджету', 'бюджетом' → 'бюджет'. Числа не змінюються."""
+    if word.isdigit():
+        return word
+    for ending in UA_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= STEM_MIN_LEN:
+            return word[:-len(ending)]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Текст → список основ слів."""
+    return [stem(w.strip("'")) for w in re.findall(r"[а-яґєіїa-z0-9']+", normalize(text)) if w.strip("'")]
+
+
+def _trigrams(term: str) -> set[str]:
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_search_index(docs: list[dict]) -> dict:
+    """
+    docs — [{key, filename, gl_text}] → індекс:
+        docs     — ті самі документи (номер документа = позиція в списку)
+        postings — {основа: [[номер_документа, tf], ...]}
+        doc_len  — кількість основ у кожному документі
+    """
+    postings = defaultdict(list)
+    doc_len = []
+    for doc_id, doc in enumerate(docs):
+        terms = Counter(tokenize(doc["gl_text"]))
+        doc_len.append(sum(terms.values()))
+        for term, tf in terms.items():
+            postings[term].append([doc_id, tf])
+    return {"docs": docs, "postings": dict(postings), "doc_len": doc_len}
+
+
+def _prepare(raw: dict) -> dict:
+    """Індекс з JSON → numpy-масиви постингів, відсортований словник і триграми для пошуку."""
+    postings = {
+        term: (np.array([p[0] for p in plist], dtype=np.int32), np.array([p[1] for p in plist], dtype=np.float32))
+        for term, plist in raw["postings"].items()
+    }
+    trigram_index = defaultdict(list)
+    for term in postings:
+        for tri in _trigrams(term):
+            trigram_index[tri].append(term)
+    doc_len = np.array(raw["doc_len"], dtype=np.float32)
+    return {
+        "docs": raw["docs"],
+        "doc_keys": np.array([doc["key"] for doc in raw["docs"]]),
+        "postings": postings,
+        "doc_len": doc_len,
+        "avg_len": float(doc_len.mean()) if len(doc_len) else 0.0,
+        "vocab": sorted(postings),
+        "trigrams": dict(trigram_index),
+    }
+
+
+def search_index_key(title_indexes: dict[str, list[dict]]) -> str:
+    """Ключ індексу — набір хешів архівів: новий квартал дає новий індекс."""
+    return content_hash("|".join(sorted(title_indexes)).encode("utf-8"))[:24]
+
+
+def save_search_index(title_indexes: dict[str, list[dict]]) -> dict:
+    """
+    {хеш_архіву: індекс назв з build_title_index} → сирий індекс по всіх питаннях: з диска або побудований
+    і збережений. Викликається з etl.py, тож сторінка лише читає готовий файл.
+    """
+    path = SEARCH_DIR / f"{search_index_key(title_indexes)}.json"
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    docs = [
+        {"key": archive_key, "filename": entry["filename"], "gl_text": entry["gl_text"]}
+        for archive_key in sorted(title_indexes)
+        for entry in title_indexes[archive_key]
+    ]
+    raw = build_search_index(docs)
+    write_json(path, raw)
+    return raw
+
+
+@st.cache_resource(show_spinner=False)
+def _load_search_index(index_key: str, _title_indexes: dict[str, list[dict]]) -> dict:
+    return _prepare(save_search_index(_title_indexes))
+
+
+def load_search_index(title_indexes: dict[str, list[dict]]) -> dict:
+    """Пошуковий індекс по всіх архівах title_indexes (усі квартали, а не вибрані) — один на процес."""
+    return _load_search_index(search_index_key(title_indexes), title_indexes)
+
+
+def _expand_term(index: dict, term: str) -> list[tuple[str, float]]:
+    """Основа запиту → [(основа_зі_словника, вага)]: точний збіг, префікс або триграмна схожість."""
+    postings = index["postings"]
+    if term in postings:
+        return [(term, 1.0)]
+
+    if len(term) >= STEM_MIN_LEN:
+        vocab = index["vocab"]
+        start = bisect.bisect_left(vocab, term)
+        prefixed = []
+        for candidate in vocab[start:start + PREFIX_MAX_TERMS]:
+            if not candidate.startswith(term):
+                break
+            prefixed.append((candidate, PREFIX_WEIGHT))
+        if prefixed:
+            return prefixed
+
+    query_tri = _trigrams(term)
+    shared = Counter(c for tri in query_tri for c in index["trigrams"].get(tri, ()))
+    similar = []
+    for candidate, n in shared.items():
+        similarity = n / (len(query_tri) + len(_trigrams(candidate)) - n)
+        if similarity >= TRIGRAM_MIN_SIMILARITY:
+            similar.append((candidate, similarity))
+    similar.sort(key=lambda x: x[1], reverse=True)
+    return similar[:TRIGRAM_MAX_TERMS]
+
+
+def search_titles(index: dict, query: str, limit: int | None = None, keys=None) -> list[dict]:
+    """
+    Ранжований пошук → документи індексу ({key, filename, gl_text}), найкращі першими.
+    Спершу документи, що містять більше слів запиту, далі — за BM25. keys — лише ці архіви (вибрані квартали).
+    """
+    n_docs = len(index["docs"])
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not n_docs or not terms:
+        return []
+
+    doc_len, avg_len = index["doc_len"], index["avg_len"] or 1.0
+    scores = np.zeros(n_docs, dtype=np.float32)
+    matched = np.zeros(n_docs, dtype=np.int16)
+    for term in terms:
+        hit = np.zeros(n_docs, dtype=bool)
+        for candidate, weight in _expand_term(index, term):
+            doc_ids, tf = index["postings"][candidate]
+            idf = math.log(1 + (n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len[doc_ids] / avg_len)
+            scores[doc_ids] += weight * idf * tf * (BM25_K1 + 1) / norm
+            hit[doc_ids] = True
+        matched += hit
+
+    found = np.flatnonzero(matched)
+    if keys is not None:
+        found = found[np.isin(index["doc_keys"][found], list(keys))]
+    order = found[np.lexsort((-scores[found], -matched[found]))]
+    if limit:
+        order = order[:limit]
+    return [index["docs"][i] for i in order]
+
+
+def bm25_scores(texts: list[str], query: str) -> np.ndarray:
+    """BM25-оцінки запиту для невеликого набору текстів (напр. сторінок PDF) без побудови індексу."""
+    docs = [Counter(tokenize(text)) for text in texts]
+    terms = set(tokenize(query))
+    scores = np.zeros(len(docs), dtype=np.float32)
+    if not docs or not terms:
+        return scores
+    doc_len = np.array([sum(d.values()) for d in docs], dtype=np.float32)
+    avg_len = float(doc_len.mean()) or 1.0
+    for term in terms:
+        tf = np.array([d.get(term, 0) for d in docs], dtype=np.float32)
+        n = int((tf > 0).sum())
+        if not n:
+            continue
+        idf = math.log(1 + (len(docs) - n + 0.5) / (n + 0.5))
+        scores += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len))
+    return scores
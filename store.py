@@ -0,0 +1,137 @@
+"""
+store.py — локальне аналітичне сховище (SQLite) у CACHE_DIR/store.sqlite, яке наповнює etl.py.
+
+Сторінки спершу читають звідси (read_table / read_document); якщо сховища чи таблиці ще немає —
+завантажують джерело з мережі, як і раніше. Кожна таблиця перезаписується однією транзакцією,
+тож читачі (WAL) бачать або попередню, або нову версію.
+"""
+
+import json
+import sqlite3
+import pandas as pd
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from data import CACHE_DIR
+
+STORE_PATH = CACHE_DIR / "store.sqlite"
+
+# dtype.kind → тип колонки SQLite; дати зберігаються ISO-рядками
+SQL_TYPES = {"i": "INTEGER", "u": "INTEGER", "b": "INTEGER", "f": "REAL", "M": "TEXT"}
+
+
+def connect() -> sqlite3.Connection:
+    """З'єднання для запису (etl.py)."""
+    STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(STORE_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def _connect_readonly() -> sqlite3.Connection | None:
+    if not STORE_PATH.exists():
+        return None
+    return sqlite3.connect(f"file:{STORE_PATH}?mode=ro", uri=True)
+
+
+def read_table(table: str, where: str = "", params: tuple = (), parse_dates: tuple = ()) -> pd.DataFrame | None:
+    """Таблиця сховища → DataFrame, або None якщо сховища/таблиці немає (тоді сторінка йде в мережу)."""
+    conn = _connect_readonly()
+    if conn is None:
+        return None
+    query = f'SELECT * FROM "{table}"' + (f" WHERE {where}" if where else "")
+    try:
+        with closing(conn):
+            return pd.read_sql_query(query, conn, params=params, parse_dates=list(parse_dates))
+    except (sqlite3.Error, pd.errors.DatabaseError):
+        return None
+
+
+def read_document(table: str, key: str, max_age: timedelta | None = None):
+    """JSON-документ за ключем (сирі відповіді API) або None. max_age — старіший документ вважається відсутнім."""
+    conn = _connect_readonly()
+    if conn is None:
+        return None
+    try:
+        with closing(conn):
+            row = conn.execute(f'SELECT body, fetched_at FROM "{table}" WHERE key = ?', (key,)).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    if max_age is not None:
+        fetched_at = datetime.fromisoformat(row[1]).replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - fetched_at > max_age:
+            return None
+    return json.loads(row[0])
+
+
+def has_document(table: str, key: str) -> bool:
+    """Чи є документ у сховищі (без читання тіла)."""
+    conn = _connect_readonly()
+    if conn is None:
+        return False
+    try:
+        with closing(conn):
+            return conn.execute(f'SELECT 1 FROM "{table}" WHERE key = ?', (key,)).fetchone() is not None
+    except sqlite3.Error:
+        return False
+
+
+def _column_type(series: pd.Series) -> str:
+    return SQL_TYPES.get(series.dtype.kind, "TEXT")
+
+
+def _sql_value(value):
+    if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy-скаляри → Python
+        return value.item()
+    return value
+
+
+def write_table(conn: sqlite3.Connection, table: str, df: pd.DataFrame,
+                primary_key: tuple = (), indexes: tuple = (), types: dict | None = None):
+    """
+    Перезаписує таблицю DataFrame-ом однією транзакцією.
+    Типи колонок — з dtype (або types), indexes — кортежі колонок для CREATE INDEX.
+    """
+    types = types or {}
+    columns = [f'"{c}" {types.get(c, _column_type(df[c]))}' for c in df.columns]
+    if primary_key:
+        columns.append("PRIMARY KEY (" + ", ".join(f'"{c}"' for c in primary_key) + ")")
+    placeholders = ", ".join("?" for _ in df.columns)
+    rows = ([_sql_value(v) for v in row] for row in df.itertuples(index=False, name=None))
+    with conn:
+        # sqlite3 сам відкриває транзакцію лише перед INSERT/UPDATE/DELETE — DROP і CREATE без явного BEGIN
+        # виконались би одразу, і помилка вставки лишила б таблицю порожньою
+        conn.execute("BEGIN")
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.execute(f'CREATE TABLE "{table}" ({", ".join(columns)})')
+        conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', rows)
+        for cols in indexes:
+            name = f"{table}_{'_'.join(cols)}"
+            conn.execute(f'CREATE INDEX "{name}" ON "{table}" (' + ", ".join(f'"{c}"' for c in cols) + ")")
+
+
+def write_documents(conn: sqlite3.Connection, table: str, documents: dict):
+    """Додає/оновлює JSON-документи {ключ: тіло} у таблиці (key, body, fetched_at)."""
+    with conn:
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" '
+            "(key TEXT PRIMARY KEY, body TEXT NOT NULL, fetched_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+        conn.executemany(
+            f'INSERT OR REPLACE INTO "{table}" (key, body) VALUES (?, ?)',
+            ((key, json.dumps(body, ensure_ascii=False)) for key, body in documents.items()),
+        )
+
+
+def save_document(table: str, key: str, body):
+    """Один документ з окремим з'єднанням — для сторінок, які дозавантажили відсутнє в сховищі."""
+    try:
+        with closing(connect()) as conn:
+            write_documents(conn, table, {key: body})
+    except sqlite3.Error:
+        pass  # сховище лише прискорює: без запису сторінка однаково має відповідь
@@ -0,0 +1,135 @@
+"""
+summaries.py — огляди рішень від ШІ (1-2 речення): постійне сховище та пакетна генерація.
+
+Огляд зберігається в CACHE_DIR/summaries/<ключ>.json, де ключ — sha256 PDF рішення (або назви,
+якщо PDF немає) + SUMMARY_PROMPT_VERSION. Зміна промпту чи моделі → нова версія → нові огляди;
+той самий PDF за іншим посиланням не генерується повторно. Сторінка читає готовий огляд одразу,
+а генерує наживо лише для нових документів.
+
+Запуск окремо: python summaries.py [--workers N] — огляди для всіх рішень, зіставлених з питаннями VOTING_QUARTERS.
+"""
+
+import base64
+import anthropic
+from data import CACHE_DIR
+from utils import content_hash
+from generated import read_generated, write_generated, run_batch, load_matched_decisions, workers_arg
+from pdfs import get_pdf_path, is_pdf_url, open_pdf, get_doc_text
+import llm
+from metrics import record
+
+SUMMARIES_DIR = CACHE_DIR / "summaries"
+
+SUMMARY_PROMPT_VERSION = 2
+SUMMARY_MODEL = "claude-haiku-4-5"
+SUMMARY_MAX_TOKENS = 150
+SUMMARY_SYSTEM = "Ти — редактор, який пише чистою літературною українською мовою без русизмів і суржику. Відповідай виключно українською."
+SUMMARY_INSTRUCTION = "Одним-двома реченнями поясни суть цього рішення. Тільки звичайний текст — без заголовків, без назви рішення, без емодзі, без списків."
+SUMMARY_TITLE_INSTRUCTION = "Одним-двома реченнями поясни суть рішення з назвою: «{title}». Тільки звичайний текст — без заголовків, без назви рішення, без емодзі, без списків."
+SUMMARY_FALLBACK = "Документ завеликий для автоматичного аналізу — ознайомтесь з оригіналом за посиланням нижче."
+
+MAX_CONCURRENCY = 4
+
+
+def summary_key(doc_url: str, title: str) -> str:
+    """sha256 обрізаного PDF (ім'я файлу в pdfs.py) або назви рішення + версія промпту."""
+    path = get_pdf_path(doc_url) if is_pdf_url(doc_url) else None
+    source = path.stem if path else "title-" + content_hash(title.encode("utf-8"))
+    return f"{source[:40]}-v{SUMMARY_PROMPT_VERSION}"
+
+
+def read_summary(key: str) -> str | None:
+    return read_generated(SUMMARIES_DIR, key, "summary")
+
+
+def write_summary(key: str, summary: str, doc_url: str, title: str):
+    write_generated(SUMMARIES_DIR, key, "summary", summary, doc_url=doc_url, title=title,
+                    model=SUMMARY_MODEL, prompt_version=SUMMARY_PROMPT_VERSION)
+
+
+def generate_summary(doc_url: str, title: str) -> str | None:
+    """
+    Огляд через API: з тексту перших сторінок, для скану — з PDF, а якщо модель відмовила через розмір —
+    лише за назвою. None — відмова за розміром на всіх варіантах. llm.LLMBusy і помилки мережі / API
+    не перехоплюються: це тимчасовий стан, а не властивість документа.
+    """
+    doc_text = get_doc_text(doc_url)
+    pdf_bytes = None if doc_text else open_pdf(doc_url)
+    prompts = []
+    if doc_text:
+        prompts.append(("text", f"{SUMMARY_INSTRUCTION}\n\nТекст рішення:\n\n{doc_text}"))
+    elif pdf_bytes:
+        prompts.append(("pdf", [
+            {
+                "type": "document",
+                "source": {
+                    "type": "base64",
+                    "media_type": "application/pdf",
+                    "data": base64.standard_b64encode(pdf_bytes).decode(),
+                },
+                "cache_control": {"type": "ephemeral"},
+            },
+            {"type": "text", "text": SUMMARY_INSTRUCTION},
+        ]))
+    prompts.append(("title", SUMMARY_TITLE_INSTRUCTION.format(title=title)))
+    for path, content in prompts:
+        try:
+            response = llm.create(
+                purpose="summary",
+                path=path,
+                model=SUMMARY_MODEL,
+                system=SUMMARY_SYSTEM,
+                max_tokens=SUMMARY_MAX_TOKENS,
+                messages=[{"role": "user", "content": content}],
+            )
+            return response.content[0].text.strip()
+        except anthropic.APIStatusError as e:
+            if not _too_large(e):
+                raise
+    return None
+
+
+def _too_large(error: anthropic.APIStatusError) -> bool:
+    """Модель відхилила сам запит (400 / 413: завеликий документ чи промпт), а не бюджет чи перевантаження."""
+    return error.status_code in (400, 413)
+
+
+def get_or_create_summary(doc_url: str, title: str, generate=None) -> str:
+    """
+    Готовий огляд зі сховища або новий (зберігається). generate(doc_url, title) → str|None — заміна API
+    (напр. локальна модель). SUMMARY_FALLBACK — лише коли документ завеликий; LLMBusy і збої API — виняток.
+    """
+    key = summary_key(doc_url, title)
+    summary = read_summary(key)
+    if summary:
+        record("summary", "store")
+        return summary
+    summary = (generate or generate_summary)(doc_url, title)
+    if not summary:
+        return SUMMARY_FALLBACK
+    write_summary(key, summary, doc_url, title)
+    return summary
+
+
+def summarize_all(documents: list[dict], max_workers: int = MAX_CONCURRENCY, generate=None) -> dict:
+    """
+    Пакетна генерація для [{doc_url, title}] з обмеженою кількістю одночасних запитів.
+    Наявні огляди пропускаються. Повертає {"created": n, "cached": n, "failed": n}.
+    """
+    generate = generate or generate_summary
+
+    def create(item):
+        doc_url, title = item
+        summary = generate(doc_url, title)
+        if summary:
+            write_summary(summary_key(doc_url, title), summary, doc_url, title)
+        return bool(summary)
+
+    unique = {d["doc_url"]: d["title"] for d in documents}
+    return run_batch(list(unique.items()), lambda item: bool(read_summary(summary_key(*item))), create, max_workers)
+
+
+if __name__ == "__main__":
+    documents = load_matched_decisions()[["doc_url", "title"]].to_dict("records")
+    stats = summarize_all(documents, max_workers=workers_arg(MAX_CONCURRENCY))
+    print(f"Оглядів: нових {stats['created']}, готових {stats['cached']}, з помилкою {stats['failed']}")
@@ -0,0 +1,130 @@
+"""
+thumbnails.py — локальні мініатюри фото депутатів у static/avatars/.
+
+Оригінали з DEPUTY_PHOTOS (300×300 з CDN КМДА) завантажуються паралельно через downloads.fetch_all,
+зменшуються до THUMB_SIZES і зберігаються як WebP: static/avatars/<id>_<розмір>.webp.
+Поруч — manifest.json з переліком наявних мініатюр, тож картки беруть фото з app/static/...
+без жодних запитів до CDN під час рендеру. Опційно — спрайт на кожен розмір (sprite_<розмір>.webp).
+
+Запуск окремо: python thumbnails.py [--sprite] — оновлює мініатюри та маніфест.
+"""
+
+import io
+import sys
+import json
+from pathlib import Path
+from PIL import Image, ImageOps
+from photos import DEPUTY_PHOTOS
+from downloads import fetch_all, get_meta
+from utils import atomic_path, write_json
+
+AVATARS_DIR = Path("static") / "avatars"
+MANIFEST_PATH = AVATARS_DIR / "manifest.json"
+STATIC_URL = "app/static/avatars"
+
+THUMB_SIZES = (48, 80, 160)
+WEBP_QUALITY = 80
+SPRITE_COLUMNS = 12
+
+
+def is_image(head: bytes) -> bool:
+    """JPEG, PNG або WebP — а не HTML-сторінка помилки."""
+    return head[:3] == b"\xff\xd8\xff" or head[:8] == b"\x89PNG\r\n\x1a\n" or (head[:4] == b"RIFF" and head[8:12] == b"WEBP")
+
+
+def _square(img: Image.Image, size: int) -> Image.Image:
+    """Квадратна мініатюра з центральним обрізанням (фото можуть бути не 1:1)."""
+    img = ImageOps.exif_transpose(img).convert("RGB")
+    return ImageOps.fit(img, (size, size), method=Image.Resampling.LANCZOS)
+
+
+def _save_webp(img: Image.Image, path: Path):
+    with atomic_path(path) as tmp_path:
+        img.save(tmp_path, format="WEBP", quality=WEBP_QUALITY, method=6)
+
+
+def load_manifest() -> dict:
+    """Маніфест мініатюр: {"avatars": {id: {"sha256", "sizes"}}, "sprites": {розмір: {"file", "positions"}}} або {}."""
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_thumbnails(photos: dict[int, dict] = DEPUTY_PHOTOS) -> dict:
+    """
+    Завантажує оригінали і пише мініатюри THUMB_SIZES. Повертає {id: {"sha256", "sizes"}}.
+    Мініатюри перерізаються лише якщо змінився вміст оригіналу (sha256 з downloads).
+    """
+    previous = load_manifest().get("avatars", {})
+    urls = {dep_id: entry["photo_url"] for dep_id, entry in photos.items() if entry.get("photo_url")}
+    paths = fetch_all(list(dict.fromkeys(urls.values())), validate=is_image)
+
+    AVATARS_DIR.mkdir(parents=True, exist_ok=True)
+    avatars = {}
+    for dep_id, url in urls.items():
+        path = paths.get(url)
+        if path is None:
+            continue
+        sha = get_meta(url).get("sha256")
+        targets = {size: AVATARS_DIR / f"{dep_id}_{size}.webp" for size in THUMB_SIZES}
+        known = previous.get(str(dep_id), {})
+        if known.get("sha256") == sha and all(p.exists() for p in targets.values()):
+            avatars[dep_id] = known
+            continue
+        try:
+            with Image.open(io.BytesIO(path.read_bytes())) as img:
+                img.load()
+                for size, target in targets.items():
+                    _save_webp(_square(img, size), target)
+        except (OSError, ValueError):
+            continue  # пошкоджений файл — картка покаже ініціали
+        avatars[dep_id] = {"sha256": sha, "sizes": list(THUMB_SIZES)}
+    return avatars
+
+
+def build_sprites(avatars: dict) -> dict:
+    """Спрайт на кожен розмір: одна картинка замість десятків → {розмір: {"file", "columns", "positions": {id: [x, y]}}}."""
+    ids = sorted(int(dep_id) for dep_id in avatars)
+    if not ids:
+        return {}
+    rows = -(-len(ids) // SPRITE_COLUMNS)
+    sprites = {}
+    for size in THUMB_SIZES:
+        sheet = Image.new("RGB", (SPRITE_COLUMNS * size, rows * size), "white")
+        positions = {}
+        for n, dep_id in enumerate(ids):
+            x, y = (n % SPRITE_COLUMNS) * size, (n // SPRITE_COLUMNS) * size
+            with Image.open(AVATARS_DIR / f"{dep_id}_{size}.webp") as thumb:
+                sheet.paste(thumb, (x, y))
+            positions[dep_id] = [x, y]
+        filename = f"sprite_{size}.webp"
+        _save_webp(sheet, AVATARS_DIR / filename)
+        sprites[size] = {"file": filename, "columns": SPRITE_COLUMNS, "positions": positions}
+    return sprites
+
+
+def write_manifest(avatars: dict, sprites: dict | None = None):
+    write_json(MANIFEST_PATH, {"avatars": avatars, "sprites": sprites or {}}, indent=2, sort_keys=True)
+
+
+def get_thumbnail_url(manifest: dict, deputy_id: int, size: int) -> str:
+    """URL найменшої мініатюри не меншої за size (для чіткості на 2x-екранах — див. get_avatar_html), або ''."""
+    entry = manifest.get("avatars", {}).get(str(deputy_id))
+    if not entry:
+        return ""
+    fitting = [s for s in entry["sizes"] if s >= size] or [max(entry["sizes"])]
+    return f"{STATIC_URL}/{deputy_id}_{min(fitting)}.webp"
+
+
+if __name__ == "__main__":
+    avatars = build_thumbnails()
+    sprites = build_sprites(avatars) if "--sprite" in sys.argv else {}
+    write_manifest(avatars, sprites)
+    missing = [dep_id for dep_id in DEPUTY_PHOTOS if dep_id not in avatars]
+    print(f"Мініатюр: {len(avatars)}, без фото: {len(missing)}, спрайтів: {len(sprites)}")
+    for dep_id in missing:
+        print(f"  ? {dep_id} {DEPUTY_PHOTOS[dep_id]['name']}")
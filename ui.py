@@ -83,9 +83,23 @@ def _vote_card_css() -> str:
     return "".join(rules)
 
 
+def _card_grid_css() -> str:
+    """HTML-сітка карток (render_card_grid) і посилання-кнопки для карток представників."""
+    return (
+        ".card-grid{display:grid;grid-template-columns:repeat(var(--cols,4),minmax(0,1fr));gap:1rem;}"
+        ".card-grid .grid-card{border-radius:12px;padding:1rem;}"
+        ".card-grid .grid-card p{margin:4px 0;}"
+        "@media (max-width:640px){.card-grid{grid-template-columns:1fr;}}"
+        # Посилання у вигляді st.link_button, але без окремого елемента Streamlit
+        ".link-btn{display:inline-block;padding:0.25rem 0.75rem;border:1px solid #cecece;border-radius:0.25rem;"
+        "color:inherit !important;text-decoration:none !important;}"
+        ".link-btn:hover{border-color:#202020;}"
+    )
+
+
 def get_all_css() -> str:
     """Повний <style> блок для st.markdown(unsafe_allow_html=True)."""
-    return f"<style>{_global_css()}{_party_card_css()}{_vote_card_css()}</style>"
+    return f"<style>{_global_css()}{_party_card_css()}{_vote_card_css()}{_card_grid_css()}</style>"
 
 
 def get_card_marker(party: str) -> str:
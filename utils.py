@@ -1,10 +1,17 @@
+import os
 import re
+import json
+import hashlib
 import pandas as pd
 import requests
 import io
 import streamlit as st
+from html import escape
+from pathlib import Path
+from contextlib import contextmanager
 from data import DEPUTIES_URL, SALARIES_URL, UA, SALARY_COMPONENTS
-from ui import PARTY_COLORS
+from ui import PARTY_COLORS, VOTE_COLORS
+from store import read_table
 
 PARTY_MAP = {
     "удар": "УДАР",
@@ -56,38 +63,77 @@ def to_short_name(full_name):
     return str(full_name).strip()
 
 
-@st.cache_data(ttl=86400, show_spinner=False)
-def _is_image_available(url: str) -> bool:
+def content_hash(data: bytes) -> str:
+    """sha256 вмісту — ключ для файлів у CACHE_DIR. Однаковий вміст → той самий файл на будь-якій репліці."""
+    return hashlib.sha256(data).hexdigest()
+
+
+@contextmanager
+def atomic_path(path: Path):
+    """
+    Тимчасовий шлях поруч з path (з pid процесу) для запису; після успішного блоку — os.replace на path.
+    Читачі й інші репліки бачать або попередній файл, або новий цілком; після помилки tmp-файл прибирається.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
     try:
-        r = requests.head(url, headers=UA, timeout=5)
-        return r.status_code == 200 and "image" in r.headers.get("Content-Type", "")
-    except Exception:
-        return False
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
 
 
-def deputy_avatar(deputy_id: int, name: str, party: str = "", size: int = 80):
-    """Аватарка депутата: фото якщо є в DEPUTY_PHOTOS, інакше — ініціали."""
-    import streamlit as st
-    from photos import get_photo_url
-    url = get_photo_url(deputy_id)
+def write_json(path: Path, data, **dump_kwargs):
+    """JSON у path атомарно (atomic_path), кирилиця без екранування."""
+    with atomic_path(path) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_avatar_manifest(mtime: float) -> dict:
+    """Маніфест мініатюр з thumbnails.py; mtime у ключі — перечитується після нового запуску."""
+    from thumbnails import load_manifest
+    return load_manifest()
+
+
+def get_avatar_html(deputy_id: int, name: str, party: str = "", size: int = 80) -> str:
+    """
+    HTML аватарки депутата: локальна мініатюра зі static/avatars/ (або позиція в спрайті),
+    інакше — ініціали на кольорі фракції. Без запитів до CDN під час рендеру.
+    """
+    from thumbnails import MANIFEST_PATH, STATIC_URL, get_thumbnail_url
     parts = str(name).split()
     initials = (parts[0][0] + parts[1][0]).upper() if len(parts) >= 2 else parts[0][0].upper()
     color = PARTY_COLORS.get(party, "#757575")
-    use_photo = url and _is_image_available(url)
-    if use_photo:
-        st.markdown(
-            f'<img src="{url}" width="{size}" height="{size}" '
-            f'style="border-radius:50%;object-fit:cover;display:block;margin-bottom:4px;">',
-            unsafe_allow_html=True,
+    style = f"width:{size}px;height:{size}px;border-radius:50%;margin-bottom:4px;"
+
+    # Без маніфесту (etl.py чи thumbnails.py ще не запускались) — ініціали, а не неперевірений URL з CDN
+    manifest = _load_avatar_manifest(MANIFEST_PATH.stat().st_mtime) if MANIFEST_PATH.exists() else {}
+    sprite = manifest.get("sprites", {}).get(str(size))
+    position = sprite["positions"].get(str(deputy_id)) if sprite else None
+    if position:
+        return (
+            f'<div style="{style}background:url({STATIC_URL}/{sprite["file"]}) '
+            f'-{position[0]}px -{position[1]}px no-repeat;"></div>'
         )
-    else:
-        st.markdown(
-            f'<div style="width:{size}px;height:{size}px;border-radius:50%;background:{color};'
-            f'display:flex;align-items:center;justify-content:center;'
-            f'color:#fff;font-weight:700;font-size:{size // 3}px;margin-bottom:4px;">'
-            f'{initials}</div>',
-            unsafe_allow_html=True,
+    url = get_thumbnail_url(manifest, deputy_id, size)
+    if url:
+        srcset = f' srcset="{get_thumbnail_url(manifest, deputy_id, size * 2)} 2x"'
+        return (
+            f'<img src="{url}"{srcset} width="{size}" height="{size}" loading="lazy" '
+            f'style="{style}object-fit:cover;display:block;">'
         )
+    return (
+        f'<div style="{style}background:{color};'
+        f'display:flex;align-items:center;justify-content:center;'
+        f'color:#fff;font-weight:700;font-size:{size // 3}px;">'
+        f'{initials}</div>'
+    )
+
+
+def deputy_avatar(deputy_id: int, name: str, party: str = "", size: int = 80):
+    """Аватарка депутата: фото якщо є в DEPUTY_PHOTOS, інакше — ініціали."""
+    st.markdown(get_avatar_html(deputy_id, name, party, size), unsafe_allow_html=True)
 
 
 def get_badge(text, color="#757575"):
@@ -106,6 +152,46 @@ def get_party_badge(party):
     return get_badge(party, color)
 
 
+def get_vote_card_html(deputy_id: int, name: str, party: str, vote: str) -> str:
+    """HTML картки результату голосування депутата для render_card_grid()."""
+    color = VOTE_COLORS.get(vote, "#999999")
+    return (
+        f'<div class="grid-card" style="background:{color}18;">'
+        f'{get_avatar_html(deputy_id, name, party, size=48)}'
+        f'<p><strong>{escape(str(name))}</strong></p>'
+        f'{get_party_badge(party)} {get_badge(vote, color)}'
+        f'</div>'
+    )
+
+
+def render_card_grid(cards: list[str], columns: int = 4):
+    """Сітка карток одним HTML-блоком — один елемент Streamlit замість кількох на кожну картку."""
+    st.markdown(
+        f'<div class="card-grid" style="--cols:{columns};">{"".join(cards)}</div>',
+        unsafe_allow_html=True,
+    )
+
+
+def paginate(df, page_size: int, key: str):
+    """
+    Поточна сторінка DataFrame → (page_df, кількість_сторінок). Номер сторінки — у st.session_state[key],
+    перемикач малює render_pagination(). Зміна фільтрів (інший набір рядків, навіть тієї ж кількості)
+    повертає на першу сторінку.
+    """
+    pages = max(1, -(-len(df) // page_size))
+    rows_key = content_hash(pd.util.hash_pandas_object(df.index, index=False).to_numpy().tobytes())
+    if st.session_state.get(f"{key}_rows") != rows_key or st.session_state.get(key, 1) > pages:
+        st.session_state[key] = 1
+    st.session_state[f"{key}_rows"] = rows_key
+    page = st.session_state.get(key, 1)
+    return df.iloc[(page - 1) * page_size: page * page_size], pages
+
+
+def render_pagination(pages: int, key: str):
+    if pages > 1:
+        st.number_input(f"Сторінка (з {pages})", min_value=1, max_value=pages, step=1, key=key)
+
+
 def extract_district(address):
     if not isinstance(address, str):
         return None
@@ -141,20 +227,28 @@ def geocode_postal_code(postal_code):
         return None
 
 
+def parse_deputies(content: bytes) -> pd.DataFrame:
+    """Excel таблиці депутатів → id, name, party, address, phone, district. Використовується в load_deputies() та etl.py."""
+    df = pd.read_excel(io.BytesIO(content), header=1)
+    df = df.dropna(subset=['ПІБ']).rename(columns={
+        '№ з/п': 'id', 'ПІБ': 'name', 'Фракція': 'party',
+        'Адреса громадської приймальні': 'address', 'Телефон': 'phone',
+    })
+    df = simplify_data(df)
+    df['district'] = df['address'].apply(extract_district)
+    return df
+
+
 # Функції для завантаження та кешування даних голосувань на 24 години
 @st.cache_data(ttl=86400)
 def load_deputies():
-    """Завантажує список депутатів Київради з data.gov.ua, кешує на 24 год. Використовується в reps.py, voting.py."""
+    """Список депутатів Київради: зі сховища etl.py, інакше з data.gov.ua. Кеш 24 год. Використовується в reps.py, voting.py."""
+    stored = read_table("deputies")
+    if stored is not None and not stored.empty:
+        return stored
     try:
         r = requests.get(DEPUTIES_URL, headers=UA, timeout=20)
-        df = pd.read_excel(io.BytesIO(r.content), header=1)
-        df = df.dropna(subset=['ПІБ']).rename(columns={
-            '№ з/п': 'id', 'ПІБ': 'name', 'Фракція': 'party',
-            'Адреса громадської приймальні': 'address', 'Телефон': 'phone',
-        })
-        df = simplify_data(df)
-        df['district'] = df['address'].apply(extract_district)
-        return df
+        return parse_deputies(r.content)
     except:
         return pd.DataFrame()
 
@@ -170,23 +264,31 @@ def render_data_footer(sources):
     )
 
 
+def parse_salaries(text: str) -> pd.DataFrame:
+    """CSV зарплат → нормалізовані ПІБ, виплати без пропусків, total і date. Використовується в load_salaries() та etl.py."""
+    df = pd.read_csv(io.StringIO(text))
+    df['employeeName'] = (
+        df['employeeName']
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.replace(r'\.(?=[А-ЯІЇЄҐ])', '. ', regex=True)
+        .str.strip()
+    )
+    pay_cols = list(SALARY_COMPONENTS.keys())
+    df[pay_cols] = df[pay_cols].fillna(0)
+    df['total'] = df[pay_cols].sum(axis=1)
+    df['date'] = pd.to_datetime(
+        df['year'].astype(str) + '-' + df['month'].astype(str).str.zfill(2) + '-01'
+    )
+    return df
+
+
 @st.cache_data(ttl=86400)
 def load_salaries():
+    stored = read_table("salaries", parse_dates=("date",))
+    if stored is not None and not stored.empty:
+        return stored
     try:
         r = requests.get(SALARIES_URL, headers=UA, timeout=20)
-        df = pd.read_csv(io.StringIO(r.text))
-        df['employeeName'] = (
-            df['employeeName']
-            .str.replace(r'\s+', ' ', regex=True)
-            .str.replace(r'\.(?=[А-ЯІЇЄҐ])', '. ', regex=True)
-            .str.strip()
-        )
-        pay_cols = list(SALARY_COMPONENTS.keys())
-        df[pay_cols] = df[pay_cols].fillna(0)
-        df['total'] = df[pay_cols].sum(axis=1)
-        df['date'] = pd.to_datetime(
-            df['year'].astype(str) + '-' + df['month'].astype(str).str.zfill(2) + '-01'
-        )
-        return df
+        return parse_salaries(r.text)
     except:
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
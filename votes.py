@@ -0,0 +1,308 @@
+"""
+votes.py — колонкова матриця голосів «депутат × питання» для архівів голосувань.
+
+Кожен ZIP з VOTING_QUARTERS один раз перетворюється на int8-матрицю (рядки — депутати,
+колонки — питання) і зберігається в CACHE_DIR/votes/<ключ>/ поруч з таблицями рядків і питань.
+Сторінка відкриває матрицю через memory-map: перегляд питання — це один зріз стовпця.
+
+Для селектора питань є окремий легкий індекс назв (CACHE_DIR/titles/<hash>-v<версія>.json): з кожного
+JSON потоково читаються лише GL_Text, дата і результат верхнього рівня, без розбору DPList.
+"""
+
+import io
+import json
+import shutil
+import zipfile
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pathlib import Path
+from data import CACHE_DIR
+from utils import content_hash, to_short_name, write_json
+from downloads import cached_path, sync_voting_archives
+from identity import load_identity_index, resolve_name
+
+VOTES_DIR = CACHE_DIR / "votes"
+TITLES_DIR = CACHE_DIR / "titles"
+
+# Змінюється разом з форматом матриці або правилами зіставлення ПІБ — старі матриці перебудовуються
+MATRIX_VERSION = 2
+# Змінюється разом з правилами читання полів у _stream_title_fields — старі індекси назв перебудовуються
+TITLE_INDEX_VERSION = 2
+
+# Мінімум голосів «За» для прийняття рішення
+VOTE_BARRIER = 61
+
+# Код голосу в матриці; ABSENT — депутата немає у списку голосування
+ABSENT = 0
+VOTE_CODES = {"За": 1, "Проти": 2, "Утримався": 3, "Не голосував": 4}
+VOTE_LABELS = {code: label for label, code in VOTE_CODES.items()}
+
+# Поля JSON, у яких може бути дата голосування (перше непорожнє)
+DATE_FIELDS = ("GL_Date", "GL_Time", "GL_DateTime", "Date")
+# Поля JSON з офіційним результатом голосування, якщо він є в архіві
+RESULT_FIELDS = ("GL_Result", "Result")
+
+TITLE_CHUNK_SIZE = 16384
+
+
+@st.cache_resource(ttl=86400, show_spinner=False)
+def _refresh_voting_archives() -> threading.Thread:
+    """Раз на добу перевіряє архіви на data.gov.ua у фоні (ETag/Last-Modified) — сторінка тим часом читає локальні копії."""
+    thread = threading.Thread(target=sync_voting_archives, daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def load_voting_archive(url):
+    """ZIP-архів поіменних голосувань з локального кешу завантажень. Повертає bytes або None."""
+    path = cached_path(url)
+    if path is None:
+        # Холодна репліка: усі квартали качаються паралельно одним заходом
+        path = sync_voting_archives().get(url)
+    else:
+        _refresh_voting_archives()
+    return path.read_bytes() if path else None
+
+
+def get_reps_lookup(reps_df: pd.DataFrame) -> pd.DataFrame:
+    """Довідник депутатів для з'єднання з голосуваннями: id, match_key, full_name, party."""
+    reps_lookup = reps_df[['id', 'name', 'party']].rename(columns={'name': 'full_name'})
+    reps_lookup.insert(1, 'match_key', reps_df['name'].apply(to_short_name))
+    return reps_lookup
+
+
+def archive_members(z: zipfile.ZipFile) -> list[str]:
+    """JSON-файли голосувань в архіві у стабільному порядку — він же порядок колонок матриці."""
+    return sorted(f for f in z.namelist() if f.endswith('.json') and not f.startswith('__'))
+
+
+def clean_vote(value) -> str:
+    """'За.' → 'За', порожнє → 'Не голосував'."""
+    text = str(value or "").replace(".", "").strip()
+    return text or "Не голосував"
+
+
+def raw_match_key(raw_name) -> str:
+    """ПІБ з JSON голосування без зайвих пробілів — ключ для identity.resolve_name."""
+    return " ".join(str(raw_name).split())
+
+
+def _first_field(data: dict, fields: tuple) -> str:
+    for field in fields:
+        if data.get(field) not in (None, ""):
+            return str(data[field])
+    return ""
+
+
+class _Incomplete(Exception):
+    """Поточний член JSON-об'єкта ще не дочитаний з архіву."""
+
+
+def _skip_ws(buf: str, pos: int, extra: str = "") -> int:
+    while pos < len(buf) and (buf[pos] in " \t\r\n" or buf[pos] in extra):
+        pos += 1
+    if pos >= len(buf):
+        raise _Incomplete
+    return pos
+
+
+def _value_end(buf: str, pos: int) -> int:
+    """Кінець JSON-значення, що починається з buf[pos], без декодування: рядки й вкладеність враховано."""
+    if buf[pos] not in '"{[':
+        # Число, true/false/null — до першого розділювача
+        for i in range(pos, len(buf)):
+            if buf[i] in ",}] \t\r\n":
+                return i
+        return len(buf)
+    depth, in_string, escaped = 0, False, False
+    for i in range(pos, len(buf)):
+        c = buf[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+                if depth == 0:
+                    return i + 1
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            depth += 1
+        elif c in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    raise _Incomplete
+
+
+def _stream_title_fields(f) -> dict:
+    """
+    Читає JSON голосування шматками і дістає лише GL_Text, дату та результат — тільки ключі
+    верхнього рівня: однойменні поля всередині DPList чи інших вкладених об'єктів пропускаються.
+    Зупиняється, щойно назва знайдена і почався DPList (або знайдено всі поля) —
+    список голосів депутатів не декодується.
+    """
+    reader = io.TextIOWrapper(f, encoding="utf-8-sig")
+    wanted = ("GL_Text",) + DATE_FIELDS + RESULT_FIELDS
+    buf, pos, found = "", 0, {}
+    while True:
+        chunk = reader.read(TITLE_CHUNK_SIZE)
+        buf += chunk
+        try:
+            while True:
+                # pos завжди на межі членів верхнього рівня: перед «{», «,» або «}»
+                key_start = _skip_ws(buf, pos, "{,")
+                if buf[key_start] == "}":
+                    return found
+                key_end = _value_end(buf, key_start)
+                colon = _skip_ws(buf, key_end)
+                value_start = _skip_ws(buf, colon + 1)
+                key = json.loads(buf[key_start:key_end])
+                if key == "DPList" and "GL_Text" in found:
+                    return found
+                value_end = _value_end(buf, value_start)
+                if value_end == len(buf) and chunk:
+                    raise _Incomplete  # число могло обірватись на межі шматка
+                if key in wanted:
+                    found[key] = json.loads(buf[value_start:value_end])
+                pos = value_end
+                has_date = any(f in found for f in DATE_FIELDS)
+                has_result = any(f in found for f in RESULT_FIELDS)
+                if "GL_Text" in found and has_date and has_result:
+                    return found
+        except (_Incomplete, json.JSONDecodeError):
+            if not chunk:
+                return found
+
+
+def build_title_index(archive_bytes: bytes) -> list[dict]:
+    """
+    Індекс назв питань архіву → [{filename, gl_text, date, result}], у порядку archive_members.
+    Зберігається в TITLES_DIR за хешем вмісту: повторні запуски й інші репліки не читають ZIP.
+    """
+    path = TITLES_DIR / f"{content_hash(archive_bytes)}-v{TITLE_INDEX_VERSION}.json"
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    index = []
+    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as z:
+        for filename in archive_members(z):
+            with z.open(filename) as f:
+                fields = _stream_title_fields(f)
+            index.append({
+                "filename": filename,
+                "gl_text": str(fields.get("GL_Text") or filename),
+                "date": _first_field(fields, DATE_FIELDS),
+                "result": _first_field(fields, RESULT_FIELDS),
+            })
+
+    write_json(path, index)
+    return index
+
+
+def _roster_hash(reps_lookup: pd.DataFrame) -> str:
+    roster = reps_lookup[['id', 'full_name']].to_json(orient="values", force_ascii=False)
+    return content_hash(f"{MATRIX_VERSION}:{roster}".encode("utf-8"))[:12]
+
+
+def matrix_key(archive_bytes: bytes, reps_lookup: pd.DataFrame) -> str:
+    """Ключ матриці: вміст архіву + склад ради (зміна складу → нові рядки)."""
+    return f"{content_hash(archive_bytes)[:24]}-{_roster_hash(reps_lookup)}"
+
+
+def build_vote_matrix(archive_bytes: bytes, reps_lookup: pd.DataFrame) -> Path:
+    """
+    Перетворює ZIP голосувань на матрицю і зберігає її в VOTES_DIR. Повертає теку з файлами:
+        matrix.npy        — int8 [рядки × питання], коди з VOTE_CODES / ABSENT
+        rows.parquet      — id, match_key, full_name, party для кожного рядка
+        questions.parquet — col, filename, gl_text, date та підсумки голосів для кожної колонки
+    Якщо матриця для цього архіву вже є — нічого не робить.
+    """
+    out_dir = VOTES_DIR / matrix_key(archive_bytes, reps_lookup)
+    if (out_dir / "matrix.npy").exists():
+        return out_dir
+
+    rows_df = reps_lookup[['id', 'match_key', 'full_name', 'party']].reset_index(drop=True)
+    identity = load_identity_index(reps_lookup)
+    row_by_id = {int(dep_id): i for i, dep_id in enumerate(rows_df['id'])}
+    row_by_name = {}  # написання → номер рядка (None — не розпізнано); кожне написання резолвиться один раз
+    unresolved = {}  # raw_name → номер рядка; ПІБ без збігу не губляться, а йдуть окремими рядками
+    cells, questions = [], []
+
+    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as z:
+        for col, filename in enumerate(archive_members(z)):
+            with z.open(filename) as f:
+                data = json.load(f)
+            for entry in data.get('DPList', []):
+                raw_name, vote_result = list(entry.values())[:2]
+                key = raw_match_key(raw_name)
+                if key not in row_by_name:
+                    row_by_name[key] = row_by_id.get(resolve_name(identity, key))
+                row = row_by_name[key]
+                if row is None:
+                    row = unresolved.setdefault(key, len(rows_df) + len(unresolved))
+                code = VOTE_CODES.get(clean_vote(vote_result), VOTE_CODES["Не голосував"])
+                cells.append((row, col, code))
+            questions.append({
+                "col": col,
+                "filename": filename,
+                "gl_text": data.get('GL_Text', filename),
+                "date": _first_field(data, DATE_FIELDS),
+            })
+
+    matrix = np.full((len(rows_df) + len(unresolved), len(questions)), ABSENT, dtype=np.int8)
+    if cells:
+        r, c, v = np.array(cells, dtype=np.int32).T
+        matrix[r, c] = v
+
+    extra_df = pd.DataFrame({
+        "id": pd.NA,
+        "match_key": list(unresolved),
+        "full_name": list(unresolved),
+        "party": "Позафракційні",
+    })
+    rows_df = pd.concat([rows_df, extra_df], ignore_index=True) if len(extra_df) else rows_df
+    rows_df['id'] = rows_df['id'].astype("Int64")
+
+    questions_df = pd.DataFrame(questions, columns=["col", "filename", "gl_text", "date"])
+    for label, code in VOTE_CODES.items():
+        questions_df[label] = (matrix == code).sum(axis=0)
+    questions_df['passed'] = questions_df["За"] >= VOTE_BARRIER
+
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    np.save(tmp_dir / "matrix.npy", matrix)
+    rows_df.to_parquet(tmp_dir / "rows.parquet", index=False)
+    questions_df.to_parquet(tmp_dir / "questions.parquet", index=False)
+    try:
+        tmp_dir.rename(out_dir)
+    except OSError:
+        # Інший процес встиг зберегти ту саму матрицю
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return out_dir
+
+
+@st.cache_resource(show_spinner=False)
+def load_vote_matrix(matrix_dir: str) -> tuple[np.ndarray, pd.DataFrame, pd.DataFrame]:
+    """Відкриває збережену матрицю через memory-map → (matrix, rows_df, questions_df)."""
+    path = Path(matrix_dir)
+    matrix = np.load(path / "matrix.npy", mmap_mode="r")
+    rows_df = pd.read_parquet(path / "rows.parquet")
+    questions_df = pd.read_parquet(path / "questions.parquet")
+    return matrix, rows_df, questions_df
+
+
+def get_question_votes(matrix: np.ndarray, rows_df: pd.DataFrame, col: int) -> pd.DataFrame:
+    """Стовпець матриці → DataFrame голосування (id, full_name, party, vote_clean) без відсутніх."""
+    codes = np.asarray(matrix[:, col])
+    present = codes != ABSENT
+    votes_df = rows_df.loc[present, ['id', 'full_name', 'party']].reset_index(drop=True)
+    votes_df['vote_clean'] = [VOTE_LABELS[c] for c in codes[present]]
+    return votes_df